@@ -3,7 +3,7 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
 from models import init_app
-from socketio_instance import socketio
+from socketio_instance import init_socketio, socketio
 from routes.users_bp.routes import users_bp
 from routes.venue_provider_bp.routes import venue_provider_bp
 from routes.vendor_bp.routes import vendor_bp
@@ -21,7 +21,7 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 jwt = JWTManager(app)
 
 init_app(app)
-socketio.init_app(app)
+init_socketio(app)
 
 app.register_blueprint(users_bp, url_prefix='/')
 app.register_blueprint(venue_provider_bp, url_prefix='/venueProvider')
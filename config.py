@@ -19,4 +19,38 @@ class Config:
     STRIPE_TEST_PUBLISHABLE_KEY = os.getenv('STRIPE_TEST_PUBLISHABLE_KEY')
     STRIPE_TEST_SECRET_KEY = os.getenv('STRIPE_TEST_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = False
+    # Create any missing indexes from models/indexes.py when the app starts
+    ENSURE_INDEXES_ON_STARTUP = os.getenv('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+    # Full werkzeug method spec, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'.
+    # Stored hashes made with a different spec are upgraded on the next login.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # Processes in the hashing pool; 0 hashes in the request thread instead, for
+    # hosts without multiprocessing support such as serverless runtimes
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    # Concurrent ImageKit uploads across all requests in a process
+    IMAGE_UPLOAD_WORKERS = int(os.getenv('IMAGE_UPLOAD_WORKERS', 8))
+    # 'memory' keeps buckets per process; use 'mongo' when running several workers
+    RATE_LIMIT_STORAGE = os.getenv('RATE_LIMIT_STORAGE', 'memory')
+    # Per-endpoint overrides, e.g. {'users_bp.login': {'ip': '20/minute', 'account': '5/minute'}}
+    RATE_LIMITS = {}
+    # Socket.IO backplane shared by all workers, e.g. redis://host:6379/0.
+    # 'local://' is an in-process stand-in; leave unset for a single process.
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+    # 'threading' everywhere except the gunicorn profile, which runs eventlet
+    # workers that monkey-patch the standard library before the app loads
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+    # Most missed notifications replayed to a socket per batch on reconnect
+    NOTIFICATION_REPLAY_LIMIT = int(os.getenv('NOTIFICATION_REPLAY_LIMIT', 100))
+    # Replay restarts this many seconds before the last notification a client saw,
+    # since ids and timestamps from different workers are only roughly ordered
+    NOTIFICATION_REPLAY_OVERLAP = int(os.getenv('NOTIFICATION_REPLAY_OVERLAP', 5))
+    # Notifications to one user within this many seconds go out as one batched frame
+    # 0 writes through: each notification is stored and sent inline, for serverless hosts
+    # where background tasks don't outlive the request
+    NOTIFICATION_FLUSH_INTERVAL = float(os.getenv('NOTIFICATION_FLUSH_INTERVAL', 0.25))
+    # Flush early once this many notifications are buffered
+    NOTIFICATION_MAX_BUFFER = int(os.getenv('NOTIFICATION_MAX_BUFFER', 500))
     
\ No newline at end of file
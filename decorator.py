@@ -1,6 +1,7 @@
-from flask import jsonify
+from flask import current_app, jsonify, request
 from functools import wraps
 from flask_jwt_extended import get_jwt_identity
+from services.rate_limit_service import check_limits, get_store
 from utils import HttpCodes
 
 
@@ -29,4 +30,35 @@ def validate_hiring_permission(user_type_required):
                 return jsonify({"message": "Permission denied"}), HttpCodes.HTTP_403_FORBIDDEN
             return func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+def rate_limit(ip=None, account=None, account_field='email'):
+    """
+    Token-bucket limits per client IP and per account, e.g. ip='30/minute'.
+    The account key is read from the JSON body field named by account_field.
+    Config.RATE_LIMITS can override both limits by endpoint name.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            limits = current_app.config.get('RATE_LIMITS', {}).get(request.endpoint, {})
+            ip_limit = limits.get('ip', ip)
+            account_limit = limits.get('account', account)
+
+            buckets = []
+            if ip_limit:
+                buckets.append((f"{request.endpoint}:ip:{request.remote_addr}", ip_limit))
+            if account_limit:
+                body = request.get_json(silent=True) or {}
+                account_id = body.get(account_field)
+                if isinstance(account_id, str) and account_id:
+                    buckets.append((f"{request.endpoint}:account:{account_id.strip().lower()}", account_limit))
+
+            retry_after = check_limits(get_store(current_app.config['RATE_LIMIT_STORAGE']), buckets)
+            if retry_after:
+                response = jsonify({"message": "Too many requests", "retry_after": retry_after})
+                response.headers['Retry-After'] = str(retry_after)
+                return response, HttpCodes.HTTP_429_TOO_MANY_REQUESTS
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,19 @@
+import os
+
+# Deployment profile for the API with Socket.IO: gunicorn -c gunicorn.conf.py app:app
+#
+# Socket.IO's polling transport needs every request of a session to reach the
+# same process, and gunicorn cannot pin sessions to workers. Run one eventlet
+# worker per gunicorn process, start as many processes (or nodes) as needed on
+# different ports behind a load balancer with sticky sessions, and point them
+# all at the same SOCKETIO_MESSAGE_QUEUE (e.g. redis://) so an event emitted
+# by any process reaches clients connected to any other.
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = 'eventlet'
+# The eventlet worker monkey-patches blocking I/O, so Socket.IO can use eventlet too
+raw_env = ['SOCKETIO_ASYNC_MODE=eventlet']
+workers = 1
+# Concurrent green threads per process; each connected socket holds one
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', 1000))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
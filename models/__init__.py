@@ -1,6 +1,37 @@
+import click
 from flask_pymongo import PyMongo
+from models.indexes import ensure_indexes
 
 mongo = PyMongo()
 
 def init_app(app):
     mongo.init_app(app)
+
+    @app.cli.command('ensure-indexes')
+    @click.option('--check', is_flag=True, help='Only report missing or drifted indexes.')
+    def ensure_indexes_command(check):
+        """Create the indexes declared in models/indexes.py and report drift."""
+        drift = ensure_indexes(mongo.db, dry_run=check)
+        for line in drift:
+            print(line)
+        print(f"{len(drift)} index differences found")
+
+    @app.cli.command('check-query-plans')
+    @click.option('--uri', default='mongodb://localhost:27017', help='Scratch mongod to seed and explain against.')
+    @click.option('--rows', default=200, help='Documents to seed per collection.')
+    @click.option('--max-ratio', default=5.0, help='Most documents a plan may examine per result.')
+    def check_query_plans_command(uri, rows, max_ratio):
+        """Fail if any model lookup scans a collection or examines too many documents."""
+        # Imported here: only this command needs the explain tooling
+        from models.query_plans import check_query_plans
+        failures = check_query_plans(mongo, uri, rows=rows, max_ratio=max_ratio)
+        for label, command_name, problem in failures:
+            print(f"{label} ({command_name}): {problem}")
+        if failures:
+            raise click.ClickException(f"{len(failures)} query plans failed")
+        print("All query plans use an index")
+
+    if app.config.get('ENSURE_INDEXES_ON_STARTUP'):
+        with app.app_context():
+            for line in ensure_indexes(mongo.db):
+                print(f"Index drift: {line}")
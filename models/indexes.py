@@ -0,0 +1,131 @@
+from pymongo.errors import OperationFailure
+
+# Every index the models rely on, by collection. Keys are listed in index
+# order; options are passed straight to create_index.
+INDEXES = {
+    'User': [
+        {"keys": [("email", 1)], "unique": True},
+    ],
+    'VenueProvider': [
+        {"keys": [("created_by", 1)]},
+        # Venue search: equality filters first, then the range/sort field.
+        # The city prefix also serves the bulk availability lookup by city.
+        {"keys": [("city", 1), ("type_of_property", 1), ("capacity", 1)]},
+        {"keys": [("city", 1), ("size", 1)]},
+        {"keys": [("state", 1), ("capacity", 1)]},
+        {"keys": [("type_of_property", 1), ("capacity", 1)]},
+        # Unfiltered searches sorted by capacity, size or name, with _id as tie-break
+        {"keys": [("capacity", 1), ("_id", 1)]},
+        {"keys": [("size", 1), ("_id", 1)]},
+        {"keys": [("name_of_venue", 1), ("_id", 1)]},
+        # Multikey indexes over the embedded lists
+        {"keys": [("amenities", 1)]},
+        {"keys": [("pricing.price", 1)]},
+    ],
+    'Vendors': [
+        {"keys": [("created_by", 1)]},
+        {"keys": [("city", 1)]},
+    ],
+    'VenuePictures': [{"keys": [("venue_id", 1)]}],
+    'VenuePricing': [{"keys": [("venue_id", 1)]}],
+    'VenueAmenities': [{"keys": [("venue_id", 1)]}],
+    'VenueAdditionalServices': [{"keys": [("venue_id", 1)]}],
+    'VendorPictures': [{"keys": [("vendor_id", 1)]}],
+    'Bookings': [
+        {"keys": [("venue_id", 1)]},
+        {"keys": [("vendor_id", 1)]},
+        {"keys": [("customer_id", 1)]},
+        {"keys": [("venue_provider_id", 1)]},
+        {"keys": [("vendor_provider_id", 1)]},
+    ],
+    'BookingCalendar': [
+        # The calendar claim protocol relies on this being unique
+        {"keys": [("entity_type", 1), ("entity_id", 1), ("year", 1)], "unique": True},
+    ],
+    'HireRequests': [
+        {"keys": [("staff_id", 1), ("requested_dates", 1)]},
+        {"keys": [("hirer_id", 1)]},
+    ],
+    'Notifications': [
+        # Inbox keyset pages, with and without the is_read filter. The first
+        # also serves socket replay, which walks it in ascending order.
+        {"keys": [("user_id", 1), ("created_at", -1), ("_id", -1)]},
+        {"keys": [("user_id", 1), ("is_read", 1), ("created_at", -1), ("_id", -1)]},
+    ],
+    'Payments': [
+        {"keys": [("user_id", 1)]},
+        {"keys": [("stripe_payment_id", 1)]},
+        {"keys": [("payment_status", 1)]},
+    ],
+    'VenuePayments': [
+        {"keys": [("venue_id", 1)]},
+        {"keys": [("payment_id", 1)]},
+    ],
+    'PaymentMethods': [
+        {"keys": [("user_id", 1)]},
+        {"keys": [("user_type", 1)]},
+    ],
+    'Staff': [{"keys": [("user_id", 1)]}],
+    'RateLimits': [
+        # Idle rate-limit buckets are dropped once they would have refilled anyway
+        {"keys": [("expires_at", 1)], "expireAfterSeconds": 0},
+    ],
+}
+
+# Options compared when checking an existing index against its declaration
+COMPARED_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression')
+
+
+def _key(keys):
+    return tuple((field, int(direction)) for field, direction in keys)
+
+
+def _options(spec):
+    # `is` checks, since expireAfterSeconds=0 is a real setting but compares equal to False
+    return {option: spec[option] for option in COMPARED_OPTIONS if spec.get(option) is not None and spec.get(option) is not False}
+
+
+def ensure_collection_indexes(collection, declared_as=None, dry_run=False):
+    """
+    Create the indexes declared for a collection and report drift.
+
+    `declared_as` applies another collection's declarations, e.g. to a scratch
+    collection that will be renamed over it. Returns a list of human-readable
+    drift lines; missing indexes are created unless `dry_run` is set.
+    """
+    declared = INDEXES.get(declared_as or collection.name, [])
+    existing = {
+        _key(info['key']): (name, info)
+        for name, info in collection.index_information().items()
+        if name != '_id_'
+    }
+
+    drift = []
+    for spec in declared:
+        key = _key(spec['keys'])
+        options = {option: value for option, value in spec.items() if option != 'keys'}
+        if key not in existing:
+            if dry_run:
+                drift.append(f"{collection.name}: missing index {list(key)} {_options(spec)}")
+                continue
+            try:
+                collection.create_index(spec['keys'], **options)
+            except OperationFailure as e:
+                drift.append(f"{collection.name}: could not create index {list(key)}: {e}")
+            continue
+
+        name, info = existing.pop(key)
+        if _options(info) != _options(spec):
+            drift.append(f"{collection.name}: index {name} has options {_options(info)}, declared {_options(spec)}")
+
+    for name, info in existing.values():
+        drift.append(f"{collection.name}: undeclared index {name} {list(_key(info['key']))}")
+    return drift
+
+
+def ensure_indexes(db, dry_run=False):
+    """Apply the whole registry to a database and return every drift line."""
+    drift = []
+    for collection in INDEXES:
+        drift.extend(ensure_collection_indexes(db[collection], dry_run=dry_run))
+    return drift
@@ -0,0 +1,246 @@
+from bson import ObjectId
+from pymongo import MongoClient, monitoring
+from models.indexes import ensure_indexes
+
+# Commands whose plans are checked; everything else (inserts, index builds) is ignored
+EXPLAINABLE = {'find', 'aggregate', 'count', 'distinct', 'update', 'delete', 'findAndModify'}
+# Envelope fields added by the driver that explain does not accept
+DRIVER_FIELDS = {'lsid', 'txnNumber', 'autocommit', 'startTransaction'}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Keep a copy of every explainable command sent while recording is on."""
+
+    def __init__(self):
+        self.commands = []
+        self.recording = False
+
+    def started(self, event):
+        if self.recording and event.command_name in EXPLAINABLE:
+            command = {
+                key: value for key, value in event.command.items()
+                if not key.startswith('$') and key not in DRIVER_FIELDS
+            }
+            self.commands.append((event.command_name, command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def seed(db, rows):
+    """Fill every registry collection with `rows` documents shaped like the models write them."""
+    ids = {name: [ObjectId() for _ in range(rows)] for name in ('user', 'venue', 'vendor', 'staff', 'payment', 'booking')}
+    owners = max(rows // 10, 1)
+
+    def owner(i):
+        return ids['user'][i % owners]
+
+    db['User'].insert_many([
+        {"_id": ids['user'][i], "email": f"user{i}@example.com", "full_name": f"User {i}", "user_type": "CUSTOMER"}
+        for i in range(rows)
+    ])
+    db['VenueProvider'].insert_many([
+        {"_id": ids['venue'][i], "created_by": str(owner(i)), "city": f"City {i % 10}", "name_of_venue": f"Venue {i}"}
+        for i in range(rows)
+    ])
+    db['Vendors'].insert_many([
+        {"_id": ids['vendor'][i], "created_by": str(owner(i)), "city": f"City {i % 10}", "name": f"Vendor {i}"}
+        for i in range(rows)
+    ])
+    for collection in ('VenuePictures', 'VenuePricing', 'VenueAmenities', 'VenueAdditionalServices'):
+        db[collection].insert_many([{"venue_id": ids['venue'][i]} for i in range(rows)])
+    db['VendorPictures'].insert_many([{"vendor_id": ids['vendor'][i]} for i in range(rows)])
+    db['Bookings'].insert_many([
+        {
+            "_id": ids['booking'][i],
+            "venue_id": ids['venue'][i] if i % 2 == 0 else None,
+            "vendor_id": ids['vendor'][i] if i % 2 else None,
+            "venue_provider_id": owner(i) if i % 2 == 0 else None,
+            "vendor_provider_id": owner(i) if i % 2 else None,
+            "customer_id": owner(i + 1),
+            "booking_date_range": [f"2026-01-{i % 28 + 1:02d}"],
+            "status": "pending"
+        }
+        for i in range(rows)
+    ])
+    db['BookingCalendar'].insert_many([
+        {"entity_type": "venue", "entity_id": ids['venue'][i], "year": 2026, "months": {"1": 1 << (i % 28)}}
+        for i in range(rows)
+    ])
+    db['HireRequests'].insert_many([
+        {
+            "staff_id": ids['staff'][i % owners],
+            "hirer_id": owner(i),
+            "requested_dates": [f"2026-01-{i % 28 + 1:02d}"],
+            "status": "pending"
+        }
+        for i in range(rows)
+    ])
+    db['Notifications'].insert_many([
+        {"user_id": owner(i), "booking_id": ids['booking'][i], "is_read": False, "created_at": ids['booking'][i].generation_time}
+        for i in range(rows)
+    ])
+    db['Payments'].insert_many([
+        {
+            "_id": ids['payment'][i],
+            "user_id": owner(i),
+            "stripe_payment_id": f"pi_{i}",
+            "payment_status": ["succeeded", "pending", "failed", "canceled", "refunded"][i % 5]
+        }
+        for i in range(rows)
+    ])
+    db['VenuePayments'].insert_many([
+        {"payment_id": ids['payment'][i], "venue_id": ids['venue'][i]} for i in range(rows)
+    ])
+    db['PaymentMethods'].insert_many([
+        {"user_id": owner(i), "user_type": "CUSTOMER" if i % 2 else "VENUE_PROVIDER"} for i in range(rows)
+    ])
+    db['Staff'].insert_many([
+        {"_id": ids['staff'][i], "user_id": ids['user'][i]} for i in range(rows)
+    ])
+    return ids
+
+
+def query_cases(ids):
+    """Every model lookup to check, as (label, call) pairs. find_all methods scan by design."""
+    from routes.bookings_bp.models import Booking, BookingCalendar, Notification
+    from routes.hire_staff_bp.models import HireRequest
+    from routes.payment_method_bp.models import PaymentMethod
+    from routes.payments_bp.models import Payment, PayedVenues
+    from routes.users_bp.models import User
+    from routes.vendor_bp.models import Vendor, VendorPicture, attach_vendor_pictures
+    from routes.venue_provider_bp.models import (
+        VenueAdditionalService, VenueAmenity, VenuePictures, VenuePricing, VenueProvider, attach_venue_details,
+        get_user_id_by_email
+    )
+
+    user, venue, vendor = ids['user'][0], ids['venue'][0], ids['vendor'][1]
+    staff, payment = ids['staff'][0], ids['payment'][0]
+    return [
+        ("User.find_by_email", lambda: User.find_by_email("user0@example.com")),
+        ("User.get_by_id", lambda: User.get_by_id(user)),
+        ("get_user_id_by_email", lambda: get_user_id_by_email("user0@example.com")),
+        ("VenueProvider.find_by_id", lambda: VenueProvider.find_by_id(venue)),
+        ("VenueProvider.search", lambda: VenueProvider.search({'city': 'City 1'}, [('_id', -1)], 0, 5, facets=True)),
+        ("VenueProvider.search(unfiltered)", lambda: VenueProvider.search({}, [('_id', -1)], 0, 5)),
+        ("VenueProvider.search(sort only)", lambda: VenueProvider.search({}, [('capacity', -1), ('_id', -1)], 0, 5)),
+        ("VenueProvider.search(by name)", lambda: VenueProvider.search({}, [('name_of_venue', 1), ('_id', 1)], 0, 5)),
+        ("VenuePricing.find_by_venue_id", lambda: VenuePricing.find_by_venue_id(venue)),
+        ("VenuePictures.find_by_venue_id", lambda: VenuePictures.find_by_venue_id(venue)),
+        ("VenueAdditionalService.find_by_venue_id", lambda: VenueAdditionalService.find_by_venue_id(venue)),
+        ("VenueAmenity.find_by_venue_id", lambda: VenueAmenity.find_by_venue_id(venue)),
+        ("attach_venue_details", lambda: attach_venue_details([{'_id': venue}, {'_id': ids['venue'][2]}])),
+        ("Vendor.find_by_id", lambda: Vendor.find_by_id(vendor)),
+        ("VendorPicture.find_by_vendor_id", lambda: VendorPicture.find_by_vendor_id(vendor)),
+        ("attach_vendor_pictures", lambda: attach_vendor_pictures([{'_id': vendor}, {'_id': ids['vendor'][3]}])),
+        ("Booking.find_by_entity", lambda: Booking.find_by_entity(venue, 'venue')),
+        ("Booking.find_by_venue_id", lambda: Booking.find_by_venue_id(venue)),
+        ("Booking.find_by_customer_id", lambda: Booking.find_by_customer_id(user)),
+        ("BookingCalendar.booked_dates", lambda: BookingCalendar.booked_dates('venue', venue, '2026-01-01', '2026-12-31')),
+        ("BookingCalendar.booked_in_window", lambda: BookingCalendar.booked_in_window('venue', [venue], ['2026-01-01'])),
+        ("Notification.find_by_user_id", lambda: Notification.find_by_user_id(user)),
+        ("Notification.find_by_user_id(unread)", lambda: Notification.find_by_user_id(user, is_read=False, limit=5)),
+        ("Notification.unread_count", lambda: Notification.unread_count(user)),
+        ("Notification.find_since", lambda: Notification.find_since(user, ids['booking'][0], 5)),
+        ("Notification.find_since(after)", lambda: Notification.find_since(
+            user, limit=5, after=Notification.encode_cursor({'_id': ids['booking'][0], 'created_at': ids['booking'][0].generation_time})
+        )),
+        ("HireRequest.find_by_staff_id", lambda: HireRequest.find_by_staff_id(staff)),
+        ("HireRequest.has_conflict", lambda: HireRequest.has_conflict(staff, ['2026-01-01'])),
+        ("HireRequest.find_booked_dates", lambda: HireRequest.find_booked_dates(staff, '2026-01-01', '2026-01-31')),
+        ("HireRequest.find_by_hirer_id", lambda: HireRequest.find_by_hirer_id(user)),
+        ("Payment.find_by_user_id", lambda: Payment.find_by_user_id(user)),
+        ("Payment.find_by_stripe_payment_id", lambda: Payment.find_by_stripe_payment_id("pi_0")),
+        ("Payment.find_by_status", lambda: Payment.find_by_status("succeeded")),
+        ("PayedVenues.find_by_venue_id", lambda: PayedVenues.find_by_venue_id(venue)),
+        ("PayedVenues.find_by_payment_id", lambda: PayedVenues.find_by_payment_id(payment)),
+        ("PaymentMethod.find_by_user_id", lambda: PaymentMethod.find_by_user_id(user)),
+        ("PaymentMethod.find_by_user_type", lambda: PaymentMethod.find_by_user_type("CUSTOMER")),
+    ]
+
+
+def _stages(node, found):
+    """Collect every plan stage name anywhere in an explain document."""
+    if isinstance(node, dict):
+        if isinstance(node.get('stage'), str):
+            found.add(node['stage'])
+        for value in node.values():
+            _stages(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _stages(value, found)
+    return found
+
+
+def _execution_stats(node):
+    """Sum docs examined and returned over every executionStats block in an explain document."""
+    examined = returned = 0
+    if isinstance(node, dict):
+        stats = node.get('executionStats')
+        if isinstance(stats, dict):
+            examined += stats.get('totalDocsExamined', 0)
+            returned += stats.get('nReturned', 0)
+        for key, value in node.items():
+            if key != 'executionStats':
+                more_examined, more_returned = _execution_stats(value)
+                examined += more_examined
+                returned += more_returned
+    elif isinstance(node, list):
+        for value in node:
+            more_examined, more_returned = _execution_stats(value)
+            examined += more_examined
+            returned += more_returned
+    return examined, returned
+
+
+def plan_problems(db, commands, max_ratio=5.0):
+    """Explain recorded commands; returns (command, problem) for each that scans or examines too much."""
+    problems = []
+    for command_name, command in commands:
+        plan = db.command('explain', command, verbosity='executionStats')
+        if 'COLLSCAN' in _stages(plan, set()):
+            problems.append((command_name, "COLLSCAN"))
+            continue
+        examined, returned = _execution_stats(plan)
+        if examined / max(returned, 1) > max_ratio:
+            problems.append((command_name, f"examined {examined} docs for {returned} results"))
+    return problems
+
+
+def check_query_plans(mongo, uri, rows=200, max_ratio=5.0):
+    """
+    Seed a scratch database, run every model lookup against it and explain
+    each command it sends. Returns (label, command, problem) for each plan
+    that scans a collection or examines more than max_ratio docs per result.
+    """
+    recorder = CommandRecorder()
+    client = MongoClient(uri, event_listeners=[recorder])
+    client.drop_database('eeve_query_plans')
+    db = client['eeve_query_plans']
+    ensure_indexes(db)
+    ids = seed(db, rows)
+
+    original_db = mongo.db
+    mongo.db = db
+    failures = []
+    try:
+        for label, call in query_cases(ids):
+            recorder.commands = []
+            recorder.recording = True
+            try:
+                call()
+            finally:
+                recorder.recording = False
+
+            failures.extend(
+                (label, command_name, problem)
+                for command_name, problem in plan_problems(db, recorder.commands, max_ratio)
+            )
+    finally:
+        mongo.db = original_db
+        client.drop_database('eeve_query_plans')
+        client.close()
+    return failures
@@ -1,9 +1,55 @@
+import calendar
 from bson import ObjectId
-from datetime import datetime
+from bson.errors import InvalidId
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from models import mongo
+from models.indexes import ensure_collection_indexes
+
+DUPLICATE_KEY = 11000
+# Naive UTC, like the datetimes pymongo returns
+EPOCH = datetime(1970, 1, 1)
+
+# Entity and owner fields copied onto each booking, as source field -> snapshot field
+VENUE_SNAPSHOT_FIELDS = {
+    'name_of_venue': 'name',
+    'city': 'city',
+    'address': 'address',
+    'state': 'state',
+    'capacity': 'capacity',
+    'size': 'size',
+    'place_description': 'description',
+}
+VENDOR_SNAPSHOT_FIELDS = {
+    'name': 'name',
+    'city': 'city',
+    'address': 'address',
+    'state': 'state',
+    'description': 'description',
+    'door_to_door_service': 'door_to_door_service',
+}
+OWNER_SNAPSHOT_FIELDS = {
+    'full_name': 'full_name',
+    'email': 'email',
+}
+
+def entity_snapshot(entity, entity_type):
+    """Venue or vendor details as embedded on bookings and shown in booking responses."""
+    if not entity:
+        return {}
+    fields = VENUE_SNAPSHOT_FIELDS if entity_type == 'venue' else VENDOR_SNAPSHOT_FIELDS
+    return {snapshot_field: entity.get(field) for field, snapshot_field in fields.items()}
+
+def owner_snapshot(owner):
+    """Owning user details as embedded on bookings and shown in booking responses."""
+    if not owner:
+        return {}
+    return {snapshot_field: owner.get(field) for field, snapshot_field in OWNER_SNAPSHOT_FIELDS.items()}
 
 class Booking:
-    def __init__(self, customer_id, booking_date_range, status='pending', venue_id=None, venue_provider_id=None, vendor_id=None, vendor_provider_id=None, paymentStatus='UnPaid'):
+    def __init__(self, customer_id, booking_date_range, status='pending', venue_id=None, venue_provider_id=None, vendor_id=None, vendor_provider_id=None, paymentStatus='UnPaid', entity_snapshot=None, owner_snapshot=None):
         self.customer_id = ObjectId(customer_id)
         self.venue_id = ObjectId(venue_id) if venue_id else None
         self.venue_provider_id = ObjectId(venue_provider_id) if venue_provider_id else None
@@ -14,6 +60,8 @@ class Booking:
         self.requested_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
         self.paymentStatus = paymentStatus
+        self.entity_snapshot = entity_snapshot or {}
+        self.owner_snapshot = owner_snapshot or {}
 
     def save(self):
         booking_data = {
@@ -27,6 +75,8 @@ class Booking:
             "requested_at": self.requested_at,
             "updated_at": self.updated_at,
             "paymentStatus": self.paymentStatus,
+            "entity_snapshot": self.entity_snapshot,
+            "owner_snapshot": self.owner_snapshot,
         }
         try:
             result = mongo.db['Bookings'].insert_one(booking_data)
@@ -74,16 +124,304 @@ class Booking:
             return e
 
     @staticmethod
-    def update_status(booking_id, new_status):
+    def refresh_entity_snapshot(entity_type, entity_id, update_data):
+        """Copy changed venue or vendor fields onto every booking that embeds them."""
+        fields = VENUE_SNAPSHOT_FIELDS if entity_type == 'venue' else VENDOR_SNAPSHOT_FIELDS
+        changes = {
+            f"entity_snapshot.{snapshot_field}": update_data[field]
+            for field, snapshot_field in fields.items() if field in update_data
+        }
+        if not changes:
+            return None
+        try:
+            return mongo.db['Bookings'].update_many({f"{entity_type}_id": ObjectId(entity_id)}, {'$set': changes})
+        except Exception as e:
+            print(str(e))
+            return e
+
+    @staticmethod
+    def refresh_owner_snapshot(owner_id, update_data):
+        """Copy changed owner fields onto every booking of the owner's venues and vendors."""
+        changes = {
+            f"owner_snapshot.{snapshot_field}": update_data[field]
+            for field, snapshot_field in OWNER_SNAPSHOT_FIELDS.items() if field in update_data
+        }
+        if not changes:
+            return None
         try:
-            return mongo.db['Bookings'].update_one(
-                {'_id':ObjectId(booking_id) },
-                {'$set': {'status': new_status, 'updated_at': datetime.utcnow()}}
+            return mongo.db['Bookings'].update_many(
+                {"$or": [{"venue_provider_id": ObjectId(owner_id)}, {"vendor_provider_id": ObjectId(owner_id)}]},
+                {'$set': changes}
             )
         except Exception as e:
             print(str(e))
             return e
 
+    @staticmethod
+    def backfill_snapshots(batch_size=500):
+        """
+        Embed entity and owner snapshots into bookings saved before they
+        existed. Works through bookings in _id order one batch at a time, so
+        it can be stopped and re-run safely.
+        """
+        backfilled = 0
+        after = None
+        while True:
+            query = {"entity_snapshot": {"$exists": False}}
+            if after:
+                query["_id"] = {"$gt": after}
+            bookings = list(
+                mongo.db['Bookings'].find(
+                    query,
+                    {"venue_id": 1, "vendor_id": 1, "venue_provider_id": 1, "vendor_provider_id": 1}
+                ).sort("_id", 1).limit(batch_size)
+            )
+            if not bookings:
+                return backfilled
+
+            def docs_by_id(collection, ids):
+                ids = list({_id for _id in ids if _id})
+                return {doc['_id']: doc for doc in mongo.db[collection].find({"_id": {"$in": ids}})} if ids else {}
+
+            venues = docs_by_id('VenueProvider', (booking.get('venue_id') for booking in bookings))
+            vendors = docs_by_id('Vendors', (booking.get('vendor_id') for booking in bookings))
+            owners = docs_by_id('User', (
+                booking.get('venue_provider_id') or booking.get('vendor_provider_id') for booking in bookings
+            ))
+
+            requests = []
+            for booking in bookings:
+                if booking.get('venue_id'):
+                    snapshot = entity_snapshot(venues.get(booking['venue_id']), 'venue')
+                else:
+                    snapshot = entity_snapshot(vendors.get(booking.get('vendor_id')), 'vendor')
+                owner = owners.get(booking.get('venue_provider_id') or booking.get('vendor_provider_id'))
+                requests.append(UpdateOne(
+                    {"_id": booking['_id']},
+                    {"$set": {"entity_snapshot": snapshot, "owner_snapshot": owner_snapshot(owner)}}
+                ))
+            mongo.db['Bookings'].bulk_write(requests, ordered=False)
+            backfilled += len(requests)
+            after = bookings[-1]['_id']
+
+class BookingCalendar:
+    """
+    Booked-day index with one document per entity per year. Each month is
+    stored as an int under `months.<month>` whose bit (day - 1) is set while
+    a pending or accepted booking holds that day.
+    """
+    _index_ready = False
+
+    @staticmethod
+    def _masks(dates):
+        """Group 'YYYY-MM-DD' strings into {year: {month: bitmask}}."""
+        masks = {}
+        for date in dates:
+            day = datetime.strptime(date, "%Y-%m-%d")
+            months = masks.setdefault(day.year, {})
+            months[str(day.month)] = months.get(str(day.month), 0) | (1 << (day.day - 1))
+        return masks
+
+    @staticmethod
+    def _dates(year, months):
+        """Expand {month: bitmask} back into sorted 'YYYY-MM-DD' strings."""
+        return [
+            f"{year:04d}-{int(month):02d}-{day + 1:02d}"
+            for month, bits in sorted(months.items(), key=lambda item: int(item[0]))
+            for day in range(31)
+            if bits >> day & 1
+        ]
+
+    @staticmethod
+    def _key(entity_type, entity_id, year):
+        return {"entity_type": entity_type, "entity_id": ObjectId(entity_id), "year": year}
+
+    @staticmethod
+    def _ensure_index():
+        """The claim protocol relies on the unique index declared in models/indexes.py."""
+        if not BookingCalendar._index_ready:
+            ensure_collection_indexes(mongo.db['BookingCalendar'])
+            BookingCalendar._index_ready = True
+
+    @staticmethod
+    def _release_masks(entity_type, entity_id, masks):
+        for year, months in masks.items():
+            mongo.db['BookingCalendar'].update_one(
+                BookingCalendar._key(entity_type, entity_id, year),
+                {"$bit": {f"months.{month}": {"and": ~mask} for month, mask in months.items()}}
+            )
+
+    @staticmethod
+    def claim(entity_type, entity_id, dates):
+        """
+        Atomically hold the given dates. Each year is claimed with a single
+        upsert that only matches while every requested bit is clear; if a day
+        is taken the upsert collides with the unique index instead. Returns
+        False, after giving back any years already claimed, on conflict.
+        """
+        BookingCalendar._ensure_index()
+        masks = BookingCalendar._masks(dates)
+        claimed = {}
+        for year, months in masks.items():
+            if not BookingCalendar._claim_year(entity_type, entity_id, year, months):
+                BookingCalendar._release_masks(entity_type, entity_id, claimed)
+                return False
+            claimed[year] = months
+        return True
+
+    @staticmethod
+    def _claim_year(entity_type, entity_id, year, months):
+        query = BookingCalendar._key(entity_type, entity_id, year)
+        query.update({
+            f"months.{month}": {"$not": {"$bitsAnySet": mask}}
+            for month, mask in months.items()
+        })
+        update = {"$bit": {f"months.{month}": {"or": mask} for month, mask in months.items()}}
+        try:
+            mongo.db['BookingCalendar'].update_one(query, update, upsert=True)
+            return True
+        except DuplicateKeyError:
+            pass
+        # Two first claims for a year race to insert the document and the
+        # loser collides even when its days are free. The server won't retry
+        # an upsert with non-equality predicates, so try once more against
+        # the document that now exists; a second collision is a real overlap.
+        try:
+            mongo.db['BookingCalendar'].update_one(query, update, upsert=True)
+            return True
+        except DuplicateKeyError:
+            return False
+
+    @staticmethod
+    def release(entity_type, entity_id, dates):
+        """Clear the bits for the given dates."""
+        BookingCalendar._release_masks(entity_type, entity_id, BookingCalendar._masks(dates))
+
+    @staticmethod
+    def booked_in_window(entity_type, entity_ids, dates):
+        """
+        Return {entity_id: [held dates]} restricted to `dates` for many
+        entities at once, using a single indexed query.
+        """
+        masks = BookingCalendar._masks(dates)
+        calendars = mongo.db['BookingCalendar'].find(
+            {
+                "entity_type": entity_type,
+                "entity_id": {"$in": [ObjectId(entity_id) for entity_id in entity_ids]},
+                "year": {"$in": list(masks)}
+            },
+            {"entity_id": 1, "year": 1, "months": 1}
+        )
+        booked = {str(entity_id): [] for entity_id in entity_ids}
+        for doc in calendars:
+            stored = doc.get('months', {})
+            hits = {month: stored.get(month, 0) & mask for month, mask in masks[doc['year']].items()}
+            booked[str(doc['entity_id'])].extend(BookingCalendar._dates(doc['year'], hits))
+        for dates_held in booked.values():
+            dates_held.sort()
+        return booked
+
+    @staticmethod
+    def booked_dates(entity_type, entity_id, date_from=None, date_to=None):
+        """
+        Return the held dates for an entity, sorted. `date_from`/`date_to`
+        ('YYYY-MM-DD', inclusive, either may be None) bound both the years
+        read from the index and the months decoded.
+        """
+        query = {"entity_type": entity_type, "entity_id": ObjectId(entity_id)}
+        years = {}
+        if date_from:
+            years["$gte"] = int(date_from[:4])
+        if date_to:
+            years["$lte"] = int(date_to[:4])
+        if years:
+            query["year"] = years
+
+        calendars = mongo.db['BookingCalendar'].find(query, {"year": 1, "months": 1}).sort("year", 1)
+        booked = []
+        for doc in calendars:
+            months = {
+                month: bits for month, bits in doc.get('months', {}).items()
+                if (not date_from or f"{doc['year']:04d}-{int(month):02d}" >= date_from[:7])
+                and (not date_to or f"{doc['year']:04d}-{int(month):02d}" <= date_to[:7])
+            }
+            booked.extend(
+                date for date in BookingCalendar._dates(doc['year'], months)
+                if (not date_from or date >= date_from) and (not date_to or date <= date_to)
+            )
+        return booked
+
+    @staticmethod
+    def _fold(calendars, booking):
+        """Add a booking's days to {(entity_type, entity_id, year): {month: bitmask}}; False if its dates are invalid."""
+        entity_type = 'venue' if booking.get('venue_id') else 'vendor'
+        entity_id = booking.get('venue_id') or booking.get('vendor_id')
+        try:
+            masks = BookingCalendar._masks(booking.get('booking_date_range') or [])
+        except ValueError:
+            return False
+        if entity_id:
+            for year, months in masks.items():
+                stored = calendars.setdefault((entity_type, entity_id, year), {})
+                for month, mask in months.items():
+                    stored[month] = stored.get(month, 0) | mask
+        return True
+
+    @staticmethod
+    def rebuild(overlap=timedelta(minutes=5)):
+        """
+        Regenerate the calendar from every non-rejected booking. The new
+        documents are written to a scratch collection and swapped in with a
+        rename so readers never see a half-built index.
+
+        Claims made on the old collection while the scan runs are lost by the
+        rename, so once it is in place every booking saved since the scan
+        began (less `overlap`, for clock skew between servers) is applied
+        again. A booking whose dates are claimed before the rename but saved
+        after this catch-up can still be missed; run with bookings paused
+        when that matters.
+        """
+        started = ObjectId.from_datetime(datetime.now(timezone.utc) - overlap)
+        calendars = {}
+        skipped = 0
+        bookings = mongo.db['Bookings'].find(
+            {"status": {"$ne": "rejected"}},
+            {"venue_id": 1, "vendor_id": 1, "booking_date_range": 1}
+        )
+        for booking in bookings:
+            if not BookingCalendar._fold(calendars, booking):
+                skipped += 1
+
+        if not calendars:
+            mongo.db['BookingCalendar'].delete_many({})
+        else:
+            scratch = mongo.db['BookingCalendarRebuild']
+            scratch.drop()
+            ensure_collection_indexes(scratch, declared_as='BookingCalendar')
+            scratch.insert_many([
+                {"entity_type": entity_type, "entity_id": entity_id, "year": year, "months": months}
+                for (entity_type, entity_id, year), months in calendars.items()
+            ])
+            scratch.rename('BookingCalendar', dropTarget=True)
+
+        # Re-apply what was booked meanwhile; $bit or is a no-op for days already set
+        recent = {}
+        for booking in mongo.db['Bookings'].find(
+            {"_id": {"$gte": started}, "status": {"$ne": "rejected"}},
+            {"venue_id": 1, "vendor_id": 1, "booking_date_range": 1}
+        ):
+            BookingCalendar._fold(recent, booking)
+        if recent:
+            mongo.db['BookingCalendar'].bulk_write([
+                UpdateOne(
+                    BookingCalendar._key(entity_type, entity_id, year),
+                    {"$bit": {f"months.{month}": {"or": mask} for month, mask in months.items()}},
+                    upsert=True
+                )
+                for (entity_type, entity_id, year), months in recent.items()
+            ], ordered=False)
+        return len(calendars), skipped
+
 class Notification:
     def __init__(self, user_id, message, booking_id, is_read=False, venue_id=None, vendor_id=None):
         self.user_id = ObjectId(user_id)
@@ -94,8 +432,10 @@ class Notification:
         self.is_read = is_read
         self.created_at = datetime.utcnow()
 
-    def save(self):
-        notification_data = {
+    def to_document(self):
+        """The stored document, with its _id assigned up front so it can be referenced before insert."""
+        return {
+            "_id": ObjectId(),
             "user_id": self.user_id,
             "message": self.message,
             "venue_id": self.venue_id,
@@ -104,43 +444,212 @@ class Notification:
             "is_read": self.is_read,
             "created_at": self.created_at
         }
+
+    def save(self):
         try:
-            result = mongo.db['Notifications'].insert_one(notification_data)
+            result = mongo.db['Notifications'].insert_one(self.to_document())
+            if not self.is_read:
+                Notification._change_unread(self.user_id, 1)
             return result.inserted_id
         except Exception as e:
             print(str(e))
             return e
 
     @staticmethod
-    def find_by_user_id(user_id, is_read=None):
+    def insert_many(documents):
+        """
+        Store a batch of notification documents and bump each recipient's
+        unread counter once. Documents already stored under the same _id are
+        skipped, so a batch that failed part way can be retried whole.
+        """
+        try:
+            failure = None
+            try:
+                mongo.db['Notifications'].insert_many(documents, ordered=False)
+                stored = documents
+            except BulkWriteError as e:
+                errors = e.details.get('writeErrors', [])
+                rejected = {error['index'] for error in errors}
+                stored = [document for i, document in enumerate(documents) if i not in rejected]
+                if any(error['code'] != DUPLICATE_KEY for error in errors):
+                    failure = e
+
+            unread = Counter(document['user_id'] for document in stored if not document['is_read'])
+            if unread:
+                result = mongo.db['NotificationCounters'].bulk_write([
+                    UpdateOne({"_id": user_id}, {"$inc": {"unread": count}})
+                    for user_id, count in unread.items()
+                ], ordered=False)
+                if result.matched_count < len(unread):
+                    Notification._seed_unread(list(unread))
+            if failure:
+                raise failure
+            return len(stored)
+        except Exception as e:
+            print(str(e))
+            return e
+
+    @staticmethod
+    def _change_unread(user_id, amount):
+        """Adjust the per-user unread counter that backs the notification badge."""
+        result = mongo.db['NotificationCounters'].update_one(
+            {"_id": ObjectId(user_id)}, {"$inc": {"unread": amount}}
+        )
+        if not result.matched_count:
+            Notification._seed_unread([user_id])
+
+    @staticmethod
+    def _seed_unread(user_ids):
+        """
+        Create missing unread counters from the inbox. Called after the write
+        that missed them, so the count already includes that write; an
+        increment on a missing counter would start it from zero instead.
+        """
+        user_ids = [ObjectId(user_id) for user_id in user_ids]
+        existing = {
+            counter['_id'] for counter in
+            mongo.db['NotificationCounters'].find({"_id": {"$in": user_ids}}, {"_id": 1})
+        }
+        for user_id in user_ids:
+            if user_id in existing:
+                continue
+            unread = mongo.db['Notifications'].count_documents({"user_id": user_id, "is_read": False})
+            mongo.db['NotificationCounters'].update_one(
+                {"_id": user_id}, {"$setOnInsert": {"unread": unread}}, upsert=True
+            )
+
+    @staticmethod
+    def encode_cursor(notification):
+        """Keyset cursor for the inbox order: created_at in milliseconds, then _id."""
+        # created_at is naive UTC; timestamp() would read it as server local time
+        created_at = notification['created_at']
+        millis = calendar.timegm(created_at.utctimetuple()) * 1000 + created_at.microsecond // 1000
+        return f"{millis}_{notification['_id']}"
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Split a cursor back into (created_at, _id); raises ValueError if it is malformed."""
+        try:
+            millis, notification_id = cursor.split('_')
+            return EPOCH + timedelta(milliseconds=int(millis)), ObjectId(notification_id)
+        except (ValueError, InvalidId):
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    @staticmethod
+    def find_by_user_id(user_id, is_read=None, after=None, limit=None):
+        """
+        Newest-first notifications for a user. Pass the `next_cursor` of the
+        previous page as `after`; returns (notifications, next_cursor).
+        """
         query = {"user_id": ObjectId(user_id)}
         if is_read is not None:
             query["is_read"] = is_read
-        try:
-            notifications = mongo.db['Notifications'].find(query).sort("created_at", -1)
-            # Convert ObjectId fields to strings to avoid serialization issues
-            return [
-                {
-                    **notification, 
-                    '_id': str(notification['_id']),
-                    'user_id': str(notification['user_id']),
-                    'venue_id': str(notification['venue_id']) if notification.get('venue_id') else None,
-                    'vendor_id': str(notification['vendor_id']) if notification.get('vendor_id') else None,
-                    'booking_id': str(notification['booking_id'])
-                } 
-                for notification in notifications
+        if after:
+            created_at, notification_id = Notification.decode_cursor(after)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": notification_id}}
             ]
+        try:
+            cursor = mongo.db['Notifications'].find(query).sort([("created_at", -1), ("_id", -1)])
+            if limit:
+                cursor = cursor.limit(limit)
+            notifications = list(cursor)
+            next_cursor = Notification.encode_cursor(notifications[-1]) if limit and len(notifications) == limit else None
+            return [Notification.serialize(notification) for notification in notifications], next_cursor
         except Exception as e:
             print(str(e))
             return e
 
     @staticmethod
-    def mark_as_read(notification_id):
+    def serialize(notification):
+        # Convert ObjectId fields to strings to avoid serialization issues
+        return {
+            **notification, 
+            '_id': str(notification['_id']),
+            'user_id': str(notification['user_id']),
+            'venue_id': str(notification['venue_id']) if notification.get('venue_id') else None,
+            'vendor_id': str(notification['vendor_id']) if notification.get('vendor_id') else None,
+            'booking_id': str(notification['booking_id'])
+        }
+
+    @staticmethod
+    def find_since(user_id, last_notification_id=None, limit=100, after=None, overlap=timedelta(seconds=5)):
+        """
+        Oldest-first notifications for a user, for socket replay.
+
+        ObjectIds and created_at from different workers are not ordered
+        relative to each other, so a notification stored by another process
+        around the same moment can sort before the last one a client saw.
+        Starting from `last_notification_id`, this returns everything created
+        from `overlap` before it onwards; clients drop repeats by _id. Pass a
+        page's `encode_cursor` as `after` to continue strictly past it.
+        """
+        query = {"user_id": ObjectId(user_id)}
+        if after:
+            created_at, notification_id = Notification.decode_cursor(after)
+            query["$or"] = [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "_id": {"$gt": notification_id}}
+            ]
+        else:
+            # The id is assigned alongside created_at, so its timestamp anchors the window
+            last_id = ObjectId(last_notification_id)
+            query["created_at"] = {"$gte": last_id.generation_time.replace(tzinfo=None) - overlap}
+            query["_id"] = {"$ne": last_id}
+        notifications = mongo.db['Notifications'].find(query).sort([("created_at", 1), ("_id", 1)]).limit(limit)
+        return [Notification.serialize(notification) for notification in notifications]
+
+    @staticmethod
+    def mark_as_read(notification_id, user_id):
+        """Mark one of the user's notifications read; returns None if it was not found or already read."""
         try:
-            return mongo.db['Notifications'].update_one(
-                {'_id': ObjectId(notification_id)},
-                {'$set': {'is_read': True}}
+            notification = mongo.db['Notifications'].find_one_and_update(
+                {'_id': ObjectId(notification_id), 'user_id': ObjectId(user_id), 'is_read': False},
+                {'$set': {'is_read': True}},
+                projection={'_id': 1}
             )
+            if notification:
+                Notification._change_unread(user_id, -1)
+            return notification
         except Exception as e:
             print(str(e))
-            return e
\ No newline at end of file
+            return e
+
+    @staticmethod
+    def mark_all_as_read(user_id):
+        """Mark every unread notification read and return how many changed."""
+        result = mongo.db['Notifications'].update_many(
+            {"user_id": ObjectId(user_id), "is_read": False},
+            {"$set": {"is_read": True}}
+        )
+        if result.modified_count:
+            # Decrement rather than reset, so notifications saved meanwhile stay counted
+            Notification._change_unread(user_id, -result.modified_count)
+        return result.modified_count
+
+    @staticmethod
+    def unread_count(user_id):
+        """Read the unread counter, seeding it from the inbox for users who predate it."""
+        counter = mongo.db['NotificationCounters'].find_one({"_id": ObjectId(user_id)})
+        if counter is None:
+            Notification._seed_unread([user_id])
+            counter = mongo.db['NotificationCounters'].find_one({"_id": ObjectId(user_id)})
+        return max(counter['unread'], 0)
+
+    @staticmethod
+    def rebuild_unread_counters():
+        """Recompute every user's unread counter from the Notifications collection."""
+        counts = list(mongo.db['Notifications'].aggregate([
+            {"$match": {"is_read": False}},
+            {"$group": {"_id": "$user_id", "unread": {"$sum": 1}}}
+        ]))
+        mongo.db['NotificationCounters'].update_many(
+            {"_id": {"$nin": [count['_id'] for count in counts]}}, {"$set": {"unread": 0}}
+        )
+        if counts:
+            mongo.db['NotificationCounters'].bulk_write([
+                UpdateOne({"_id": count['_id']}, {"$set": {"unread": count['unread']}}, upsert=True)
+                for count in counts
+            ], ordered=False)
+        return len(counts)
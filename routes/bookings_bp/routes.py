@@ -1,61 +1,133 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from routes.venue_provider_bp.models import get_user_id_by_email
 from utils import HttpCodes
-from .models import Booking, Notification
+from .models import Booking, BookingCalendar, Notification, entity_snapshot, owner_snapshot
 from models import mongo
 from bson import ObjectId
+from services.booking_service import BookingTransitionError, transition_booking
 from services.email_service import send_booking_status_notification_to_customer, send_booking_request_notification_to_provider
 from routes.users_bp.models import User
-from socketio_instance import socketio
-from decorator import validate_booking_permission
+from services.auth_service import check_if_admin
+from services.notification_service import dispatcher
+from routes.helpers import generate_date_range, get_current_user_id, get_date_window
+from decorator import rate_limit, validate_booking_permission
 
 bookings_bp = Blueprint('bookings_bp', __name__)
 
-def get_entity_details(entity_id, entity_type):
-    """Fetch details of either a venue or vendor based on the entity type."""
-    
+def get_entity_with_owner(entity_id, entity_type):
+    """Fetch a venue or vendor document together with the user who owns it."""
     if entity_type == 'venue':
         entity = mongo.db['VenueProvider'].find_one({"_id": ObjectId(entity_id)})
-        if entity:
-            entity_name = entity['name_of_venue']
-            entity_owner = mongo.db['User'].find_one({"_id": ObjectId(entity['created_by'])})
     elif entity_type == 'vendor':
         entity = mongo.db['Vendors'].find_one({"_id": ObjectId(entity_id)})
-        if entity:
-            entity_name = entity['name']
-            entity_owner = mongo.db['User'].find_one({"_id": ObjectId(entity['created_by'])})
     else:
-        return None, None, None
+        return None, None
 
+    if not entity:
+        return None, None
+    return entity, mongo.db['User'].find_one({"_id": ObjectId(entity['created_by'])})
+
+def get_entity_details(entity_id, entity_type):
+    """Fetch details of either a venue or vendor based on the entity type."""
+    entity, entity_owner = get_entity_with_owner(entity_id, entity_type)
     if entity and entity_owner:
-        owner_email = entity_owner['email']
-        owner_id = entity_owner['_id']
-        return entity_name, owner_email, owner_id
+        entity_name = entity_snapshot(entity, entity_type)['name']
+        return entity_name, entity_owner['email'], entity_owner['_id']
     return None, None, None
 
-def create_notification_for_booking(user_id, message, booking_id, entity_id, entity_type):
-    """Create a notification for a booking."""
-    notification = Notification(
+@bookings_bp.cli.command('rebuild-calendar')
+def rebuild_calendar():
+    """Regenerate the booked-day calendar index from the Bookings collection."""
+    rebuilt, skipped = BookingCalendar.rebuild()
+    print(f"Rebuilt {rebuilt} calendar documents, skipped {skipped} bookings with invalid dates")
+
+@bookings_bp.cli.command('backfill-snapshots')
+def backfill_snapshots():
+    """Embed entity and owner snapshots into bookings that predate them."""
+    backfilled = Booking.backfill_snapshots()
+    print(f"Backfilled {backfilled} bookings")
+
+def get_booking_parties(entity_id, entity_type, customer_email):
+    """
+    Fetch a venue or vendor, its owner and the booking customer's id in one
+    aggregation: the owner and the customer are independent $lookup stages
+    on the entity document.
+    """
+    collection = {'venue': 'VenueProvider', 'vendor': 'Vendors'}.get(entity_type)
+    if not collection:
+        return None, None, None
+
+    results = list(mongo.db[collection].aggregate([
+        {"$match": {"_id": ObjectId(entity_id)}},
+        {"$lookup": {
+            "from": "User",
+            "let": {"owner_id": {"$convert": {"input": "$created_by", "to": "objectId", "onError": None, "onNull": None}}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$owner_id"]}}},
+                {"$project": {"full_name": 1, "email": 1}}
+            ],
+            "as": "owner"
+        }},
+        {"$lookup": {
+            "from": "User",
+            "pipeline": [{"$match": {"email": customer_email}}, {"$project": {"_id": 1}}],
+            "as": "customer"
+        }},
+    ]))
+    if not results:
+        return None, None, None
+
+    entity = results[0]
+    owner = entity.pop('owner')
+    customer = entity.pop('customer')
+    return entity, owner[0] if owner else None, customer[0]['_id'] if customer else None
+
+def notify_booking_request(owner_id, owner_email, entity_name, customer_email, booking_date_range, booking_id, entity_id, entity_type):
+    """Email, store and push the booking request notification for the owner."""
+    send_booking_request_notification_to_provider(owner_email, entity_name, customer_email, booking_date_range)
+    message = f"You received a booking request for {entity_name}"
+    dispatcher.dispatch(owner_id, 'booking_request', {
+        'message': message,
+        'entity_id': str(entity_id),
+        'customer_email': customer_email
+    }, build_booking_notification(owner_id, message, booking_id, entity_id, entity_type))
+
+def notify_booking_status(customer_id, entity_name, status, booking_id, entity_id, entity_type):
+    """Email, store and push a booking status change for the customer."""
+    message = f"Your booking for {entity_name} has been {status}."
+
+    customer = mongo.db['User'].find_one({"_id": customer_id}, {"email": 1})
+    if customer:
+        send_booking_status_notification_to_customer(customer['email'], entity_name, status)
+
+    dispatcher.dispatch(customer_id, 'booking_status', {
+        'message': message,
+        'booking_id': str(booking_id)
+    }, build_booking_notification(customer_id, message, booking_id, entity_id, entity_type))
+
+def build_booking_notification(user_id, message, booking_id, entity_id, entity_type):
+    """Build the stored notification for a booking; the dispatcher saves it in its next batch."""
+    return Notification(
         user_id=user_id,
         message=message,
         booking_id=booking_id,
         venue_id=entity_id if entity_type == 'venue' else None,
         vendor_id=entity_id if entity_type == 'vendor' else None
     )
-    notification.save()
 
 @bookings_bp.route('/entities/<entity_type>/<entity_id>/availability', methods=['GET'])
+@rate_limit(ip='120/minute')
 def check_availability(entity_type, entity_id):
-    """Check availability for venue or vendor."""
+    """Check availability for venue or vendor within a `from`/`to` or `month` window."""
     try:
-        bookings = Booking.find_by_entity(entity_id, entity_type)
-        # Extract and flatten all booked dates from each booking
-        booked_dates = [date for booking in bookings for date in booking['booking_date_range']]
-        # Remove duplicates by converting to a set, then back to a list
-        unique_booked_dates = list(set(booked_dates))
-        # Sort the dates for a consistent response (optional)
-        unique_booked_dates.sort()
+        try:
+            date_from, date_to = get_date_window(request.args)
+        except ValueError:
+            return jsonify({"error": "Use 'month' as YYYY-MM or 'from'/'to' as YYYY-MM-DD"}), HttpCodes.HTTP_400_BAD_REQUEST
+
+        # The calendar index already holds each booked day once, in order
+        unique_booked_dates = BookingCalendar.booked_dates(entity_type, entity_id, date_from, date_to)
         entity_name, owner_email, owner_id = get_entity_details(entity_id, entity_type)
         return jsonify({
             "booked_dates": unique_booked_dates, 
@@ -65,6 +137,68 @@ def check_availability(entity_type, entity_id):
     except Exception as e:
         return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
 
+MAX_BULK_ENTITIES = 500
+MAX_BULK_DAYS = 366
+
+@bookings_bp.route('/entities/<entity_type>/availability', methods=['POST'])
+@rate_limit(ip='20/minute')
+def check_bulk_availability(entity_type):
+    """Report which of many venues or vendors are free over a date range."""
+    try:
+        if entity_type not in ('venue', 'vendor'):
+            return jsonify({"message": "Invalid entity type. Must be 'venue' or 'vendor'."}), HttpCodes.HTTP_400_BAD_REQUEST
+
+        data = request.json or {}
+        date_from = data.get('from')
+        date_to = data.get('to')
+        if not date_from or not date_to:
+            return jsonify({"error": "Please provide both 'from' and 'to'"}), HttpCodes.HTTP_400_BAD_REQUEST
+        try:
+            requested_dates = generate_date_range(date_from, date_to)
+        except ValueError:
+            return jsonify({"error": "Dates must be in YYYY-MM-DD format"}), HttpCodes.HTTP_400_BAD_REQUEST
+        if not requested_dates or len(requested_dates) > MAX_BULK_DAYS:
+            return jsonify({"error": f"Date range must cover 1 to {MAX_BULK_DAYS} days"}), HttpCodes.HTTP_400_BAD_REQUEST
+
+        # Either an explicit id list or a city filter selects the entities
+        collection = 'VenueProvider' if entity_type == 'venue' else 'Vendors'
+        entity_ids = data.get('entity_ids')
+        explicit_ids = entity_ids is not None
+        unknown_ids = []
+        if not explicit_ids:
+            city = data.get('city')
+            if not city:
+                return jsonify({"error": "Please provide 'entity_ids' or 'city'"}), HttpCodes.HTTP_400_BAD_REQUEST
+            entities = mongo.db[collection].find({"city": city}, {"_id": 1}).limit(MAX_BULK_ENTITIES + 1)
+            entity_ids = [str(entity['_id']) for entity in entities]
+        elif not isinstance(entity_ids, list) or not all(
+            isinstance(entity_id, str) and ObjectId.is_valid(entity_id) for entity_id in entity_ids
+        ):
+            return jsonify({"error": "'entity_ids' must be a list of ids"}), HttpCodes.HTTP_400_BAD_REQUEST
+        if len(entity_ids) > MAX_BULK_ENTITIES:
+            return jsonify({"error": f"At most {MAX_BULK_ENTITIES} entities can be checked at once"}), HttpCodes.HTTP_400_BAD_REQUEST
+
+        if explicit_ids:
+            # Ids with no venue or vendor behind them have no calendar and would look free
+            existing = {
+                str(entity['_id'])
+                for entity in mongo.db[collection].find({"_id": {"$in": [ObjectId(entity_id) for entity_id in entity_ids]}}, {"_id": 1})
+            }
+            requested = list(dict.fromkeys(str(ObjectId(entity_id)) for entity_id in entity_ids))
+            unknown_ids = [entity_id for entity_id in requested if entity_id not in existing]
+            entity_ids = [entity_id for entity_id in requested if entity_id in existing]
+
+        booked = BookingCalendar.booked_in_window(entity_type, entity_ids, requested_dates)
+        return jsonify({
+            "entities": [
+                {"entity_id": entity_id, "free": not booked_dates, "booked_dates": booked_dates}
+                for entity_id, booked_dates in booked.items()
+            ],
+            "unknown_entity_ids": unknown_ids
+        }), HttpCodes.HTTP_200_OK
+    except Exception as e:
+        return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
+
 @bookings_bp.route('/entities/<entity_type>/<entity_id>/book', methods=['POST'])
 @jwt_required()
 @validate_booking_permission(entity_type_required='vendor')
@@ -73,89 +207,55 @@ def book_entity(entity_type, entity_id):
     try:
         data = request.json
         customer_email = data['customer_email']
-        customer_id = get_user_id_by_email(customer_email)
-
-        if not customer_id:
-            return jsonify({"message": "Customer not found"}), HttpCodes.HTTP_404_NOT_FOUND
-
         booking_date_range = data['booking_date_range']
 
-        # Check if the requested dates are already booked
-        bookings = Booking.find_by_entity(entity_id, entity_type)
-        booked_dates = [date for booking in bookings for date in booking['booking_date_range']]
-        if any(date in booked_dates for date in booking_date_range):
-            return jsonify({"error": "Some or all dates are already booked"}), HttpCodes.HTTP_400_BAD_REQUEST
-
-        # Get entity details (venue or vendor)
-        entity_name, owner_email, owner_id = get_entity_details(entity_id, entity_type)
-        if not entity_name or not owner_email or not owner_id:
+        # Entity, owner and customer are read together in one round trip
+        entity, owner, customer_id = get_booking_parties(entity_id, entity_type, customer_email)
+        if entity and not customer_id:
+            return jsonify({"message": "Customer not found"}), HttpCodes.HTTP_404_NOT_FOUND
+        if not entity or not owner:
             return jsonify({"message": "Entity not found"}), HttpCodes.HTTP_404_NOT_FOUND
+        entity_details = entity_snapshot(entity, entity_type)
+        owner_details = owner_snapshot(owner)
+        entity_name = entity_details['name']
+        owner_email = owner['email']
+        owner_id = owner['_id']
+
+        # Claim the requested dates; the database rejects any overlap atomically
+        try:
+            claimed = BookingCalendar.claim(entity_type, entity_id, booking_date_range)
+        except ValueError:
+            return jsonify({"error": "Booking dates must be in YYYY-MM-DD format"}), HttpCodes.HTTP_400_BAD_REQUEST
+        if not claimed:
+            return jsonify({"error": "Some or all dates are already booked"}), HttpCodes.HTTP_400_BAD_REQUEST
 
-        # Save new booking
+        # Save new booking with a snapshot of the entity and its owner
         new_booking = Booking(
             customer_id=customer_id,
             booking_date_range=booking_date_range,
             venue_id=entity_id if entity_type == 'venue' else None,
             venue_provider_id=owner_id if entity_type == 'venue' else None,
             vendor_id=entity_id if entity_type == 'vendor' else None,
-            vendor_provider_id=owner_id if entity_type == 'vendor' else None
+            vendor_provider_id=owner_id if entity_type == 'vendor' else None,
+            entity_snapshot=entity_details,
+            owner_snapshot=owner_details
         )
         booking_id = new_booking.save()
+        if isinstance(booking_id, Exception):
+            BookingCalendar.release(entity_type, entity_id, booking_date_range)
+            return jsonify({"error": str(booking_id)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
 
-        # Retrieve detailed information for booking response
         booking_details = {
-            "booking_date_range": booking_date_range
+            "booking_date_range": booking_date_range,
+            f"{entity_type}_details": entity_details,
+            f"{entity_type}_provider_details": owner_details
         }
 
-        # Get details for venue and vendor based on the type of booking
-        if entity_type == 'venue':
-            venue_details = mongo.db['VenueProvider'].find_one({"_id": ObjectId(entity_id)})
-            venue_provider_details = mongo.db['User'].find_one({"_id": ObjectId(owner_id)})
-
-            booking_details.update({
-                "venue_details": {
-                    "name": venue_details['name_of_venue'],
-                    "city": venue_details['city'],
-                    "address": venue_details['address'],
-                    "state": venue_details['state'],
-                    "capacity": venue_details['capacity'],
-                    "size": venue_details['size'],
-                    "description": venue_details['place_description'],
-                },
-                "venue_provider_details": {
-                    "full_name": venue_provider_details['full_name'],
-                    "email": venue_provider_details['email']
-                }
-            })
-
-        elif entity_type == 'vendor':
-            vendor_details = mongo.db['Vendors'].find_one({"_id": ObjectId(entity_id)})
-            vendor_provider_details = mongo.db['User'].find_one({"_id": ObjectId(owner_id)})
-
-            booking_details.update({
-                "vendor_details": {
-                    "name": vendor_details['name'],
-                    "city": vendor_details['city'],
-                    "address": vendor_details['address'],
-                    "state": vendor_details['state'],
-                    "description": vendor_details['description'],
-                    "door_to_door_service": vendor_details['door_to_door_service'],
-                },
-                "vendor_provider_details": {
-                    "full_name": vendor_provider_details['full_name'],
-                    "email": vendor_provider_details['email']
-                }
-            })
-
-        # Notify owner about the booking request
-        send_booking_request_notification_to_provider(owner_email, entity_name, customer_email, booking_date_range)
-        create_notification_for_booking(owner_id, f"You received a booking request for {entity_name}", booking_id, entity_id, entity_type)
-
-        socketio.emit('booking_request', {
-            'message': f"You received a booking request for {entity_name}",
-            'entity_id': str(entity_id),
-            'customer_email': customer_email
-        }, namespace='/notifications')
+        # Notify owner about the booking request without holding up the response
+        dispatcher.defer(
+            notify_booking_request,
+            owner_id, owner_email, entity_name, customer_email, booking_date_range, booking_id, entity_id, entity_type
+        )
 
         # Include booking details in the response
         return jsonify({
@@ -170,48 +270,27 @@ def book_entity(entity_type, entity_id):
 @bookings_bp.route('/<booking_id>/accept', methods=['POST'])
 @jwt_required()
 def accept_booking(booking_id):
-    """Accept a booking request if user has permission based on entity type."""
+    """Accept a pending booking request if user has permission based on entity type."""
     try:
         # Get the current user's type
         current_user = get_jwt_identity()
         user_type = current_user.get('user_type')
 
-        # Fetch booking details
-        booking = mongo.db['Bookings'].find_one({"_id": ObjectId(booking_id)})
-        if not booking:
-            return jsonify({"message": "Booking not found"}), HttpCodes.HTTP_404_NOT_FOUND
+        # Move the booking out of pending; fails if another session got there first
+        try:
+            booking = transition_booking(booking_id, user_type, get_current_user_id(), 'booked')
+        except BookingTransitionError as e:
+            return jsonify({"message": e.message}), e.status_code
 
-        # Determine entity type and check permissions
         entity_id = booking['venue_id'] or booking['vendor_id']
         entity_type = 'venue' if booking['venue_id'] else 'vendor'
+        entity_name = booking.get('entity_snapshot', {}).get('name')
 
-        if (entity_type == 'venue' and user_type != 'VENUE_PROVIDER') or \
-           (entity_type == 'vendor' and user_type != 'VENDOR_PROVIDER'):
-            return jsonify({"message": "Permission denied"}), HttpCodes.HTTP_403_NOT_VERIFIED
-
-        # Update booking status
-        Booking.update_status(booking_id, 'booked')
-
-        # Fetch customer details for notification
-        customer_id = booking['customer_id']
-        entity_name, _, _ = get_entity_details(entity_id, entity_type)
-        customer = mongo.db['User'].find_one({"_id": ObjectId(customer_id)})
-        customer_email = customer['email']
-
-        # Send notifications
-        create_notification_for_booking(
-            customer_id, 
-            f"Your booking for {entity_name} has been accepted.", 
-            booking_id, 
-            entity_id, 
-            entity_type
+        # Notify the customer without holding up the response
+        dispatcher.defer(
+            notify_booking_status,
+            booking['customer_id'], entity_name, 'accepted', booking_id, entity_id, entity_type
         )
-        send_booking_status_notification_to_customer(customer_email, entity_name, 'accepted')
-        
-        socketio.emit('booking_status', {
-            'message': f"Your booking for {entity_name} has been accepted.",
-            'booking_id': str(booking_id)
-        }, namespace='/notifications')
 
         return jsonify({"message": "Booking accepted"}), HttpCodes.HTTP_200_OK
     except Exception as e:
@@ -220,81 +299,69 @@ def accept_booking(booking_id):
 @bookings_bp.route('/<booking_id>/reject', methods=['POST'])
 @jwt_required()
 def reject_booking(booking_id):
-    """Reject a booking request if user has permission based on entity type."""
+    """Reject a pending booking request if user has permission based on entity type."""
     try:
         # Get the current user's type
         current_user = get_jwt_identity()
         user_type = current_user.get('user_type')
 
-        # Fetch booking details
-        booking = mongo.db['Bookings'].find_one({"_id": ObjectId(booking_id)})
-        if not booking:
-            return jsonify({"message": "Booking not found"}), HttpCodes.HTTP_404_NOT_FOUND
+        # Move the booking out of pending; fails if another session got there first
+        try:
+            booking = transition_booking(booking_id, user_type, get_current_user_id(), 'rejected')
+        except BookingTransitionError as e:
+            return jsonify({"message": e.message}), e.status_code
 
-        # Determine entity type and check permissions
         entity_id = booking['venue_id'] or booking['vendor_id']
         entity_type = 'venue' if booking['venue_id'] else 'vendor'
+        entity_name = booking.get('entity_snapshot', {}).get('name')
 
-        if (entity_type == 'venue' and user_type != 'VENUE_PROVIDER') or \
-           (entity_type == 'vendor' and user_type != 'VENDOR_PROVIDER'):
-            return jsonify({"message": "Permission denied"}), HttpCodes.HTTP_403_NOT_VERIFIED
+        # Give the dates back to the calendar
+        BookingCalendar.release(entity_type, entity_id, booking['booking_date_range'])
 
-        # Update booking status
-        Booking.update_status(booking_id, 'rejected')
-
-        # Fetch customer details for notification
-        customer_id = booking['customer_id']
-        entity_name, _, _ = get_entity_details(entity_id, entity_type)
-        customer = mongo.db['User'].find_one({"_id": ObjectId(customer_id)})
-        customer_email = customer['email']
-
-        # Send notifications
-        create_notification_for_booking(
-            customer_id, 
-            f"Your booking for {entity_name} has been rejected.", 
-            booking_id, 
-            entity_id, 
-            entity_type
+        # Notify the customer without holding up the response
+        dispatcher.defer(
+            notify_booking_status,
+            booking['customer_id'], entity_name, 'rejected', booking_id, entity_id, entity_type
         )
-        send_booking_status_notification_to_customer(customer_email, entity_name, 'rejected')
-        
-        socketio.emit('booking_status', {
-            'message': f"Your booking for {entity_name} has been rejected.",
-            'booking_id': str(booking_id)
-        }, namespace='/notifications')
 
         return jsonify({"message": "Booking rejected"}), HttpCodes.HTTP_200_OK
     except Exception as e:
         return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
-    
+
 @bookings_bp.route('/entities/<entity_type>/provider/bookings', methods=['GET'])
 @jwt_required()
 def get_bookings_for_provider(entity_type):
     """Get all bookings for a provider based on the entity type with detailed booking information."""
     try:
-        current_user = get_jwt_identity()
-        print(current_user)
-        provider_id = get_user_id_by_email(current_user.get('email'))
-        print(provider_id)
+        provider_id = get_current_user_id()
         if not provider_id:
             return jsonify({"message": "Provider ID is required"}), HttpCodes.HTTP_400_BAD_REQUEST
 
-        # Build the query based on entity type
-        query = {}
-        if entity_type == 'venue':
-            query['venue_provider_id'] = ObjectId(provider_id) 
-        elif entity_type == 'vendor':
-            query['vendor_provider_id'] = ObjectId(provider_id)
-        else:
+        if entity_type not in ('venue', 'vendor'):
             return jsonify({"message": "Invalid entity type. Must be 'venue' or 'vendor'."}), HttpCodes.HTTP_400_BAD_REQUEST
-        print(entity_type)
-        print(query)
-        # Fetch bookings based on the query
-        bookings = mongo.db['Bookings'].find(query)
-        booking_list = []
 
+        # Entity and provider details are embedded; only the customer is joined
+        bookings = mongo.db['Bookings'].aggregate([
+            {"$match": {f"{entity_type}_provider_id": ObjectId(provider_id)}},
+            {"$lookup": {"from": "User", "localField": "customer_id", "foreignField": "_id", "as": "customer"}},
+            {"$project": {
+                "customer_id": 1,
+                "booking_date_range": 1,
+                "status": 1,
+                "paymentStatus": 1,
+                "requested_at": 1,
+                "updated_at": 1,
+                "entity_snapshot": 1,
+                "owner_snapshot": 1,
+                "customer.full_name": 1,
+                "customer.email": 1,
+                "customer.user_type": 1,
+            }},
+        ])
+
+        booking_list = []
         for booking in bookings:
-            # Base booking details
+            customer = booking["customer"][0] if booking["customer"] else {}
             booking_details = {
                 "_id": str(booking["_id"]),
                 "customer_id": str(booking["customer_id"]),
@@ -303,58 +370,14 @@ def get_bookings_for_provider(entity_type):
                 "paymentStatus": booking.get("paymentStatus"),
                 "requested_at": booking["requested_at"].isoformat(),
                 "updated_at": booking["updated_at"].isoformat(),
+                f"{entity_type}_details": booking.get("entity_snapshot", {}),
+                f"{entity_type}_provider_details": booking.get("owner_snapshot", {}),
+                "customer_details": {
+                    "full_name": customer.get('full_name'),
+                    "email": customer.get('email'),
+                    "user_type": customer.get('user_type')
+                }
             }
-
-            # Entity-specific details
-            if entity_type == 'venue':
-                # Get venue details
-                venue_details = mongo.db['VenueProvider'].find_one({"_id": booking["venue_id"]})
-                venue_provider_details = mongo.db['User'].find_one({"_id": booking["venue_provider_id"]})
-                
-                booking_details["venue_details"] = {
-                    "name": venue_details['name_of_venue'],
-                    "city": venue_details['city'],
-                    "address": venue_details['address'],
-                    "state": venue_details['state'],
-                    "capacity": venue_details['capacity'],
-                    "size": venue_details['size'],
-                    "description": venue_details['place_description']
-                } if venue_details else {}
-
-                booking_details["venue_provider_details"] = {
-                    "full_name": venue_provider_details['full_name'],
-                    "email": venue_provider_details['email']
-                } if venue_provider_details else {}
-
-            elif entity_type == 'vendor':
-                # Get vendor details
-                vendor_details = mongo.db['Vendors'].find_one({"_id": booking["vendor_id"]})
-                vendor_provider_details = mongo.db['User'].find_one({"_id": booking["vendor_provider_id"]})
-                
-                booking_details["vendor_details"] = {
-                    "name": vendor_details['name'],
-                    "city": vendor_details['city'],
-                    "address": vendor_details['address'],
-                    "state": vendor_details['state'],
-                    "description": vendor_details['description'],
-                    "door_to_door_service": vendor_details['door_to_door_service']
-                } if vendor_details else {}
-
-                booking_details["vendor_provider_details"] = {
-                    "full_name": vendor_provider_details['full_name'],
-                    "email": vendor_provider_details['email']
-                } if vendor_provider_details else {}
-                
-            customer_details = mongo.db['User'].find_one({"_id": ObjectId(booking["customer_id"])})
-            customer_email = customer_details['email']
-            customer_name = customer_details['full_name']
-            customer_type = customer_details['user_type']
-            booking_details["customer_details"] = {
-                "full_name": customer_name,
-                "email": customer_email,
-                "user_type": customer_type
-            }
-
             booking_list.append(booking_details)
 
         # Return the list of bookings with detailed information
@@ -363,27 +386,82 @@ def get_bookings_for_provider(entity_type):
     except Exception as e:
         return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
 
+ADMIN_PAGE_SIZE = 100
+MAX_ADMIN_PAGE_SIZE = 1000
+
+def fetch_admin_booking_page(after=None, limit=ADMIN_PAGE_SIZE):
+    """
+    Return one page of bookings ordered by _id, starting after the `after`
+    cursor. Entity names come from the embedded snapshot and customer names
+    for the page are resolved with a single $in query.
+    """
+    query = {"_id": {"$gt": ObjectId(after)}} if after else {}
+    bookings = list(
+        mongo.db['Bookings'].find(
+            query,
+            {"customer_id": 1, "entity_snapshot.name": 1, "booking_date_range": 1, "status": 1}
+        ).sort("_id", 1).limit(limit)
+    )
+
+    customer_ids = list({booking['customer_id'] for booking in bookings})
+    customer_names = {
+        user['_id']: user.get('full_name')
+        for user in mongo.db['User'].find({"_id": {"$in": customer_ids}}, {"full_name": 1})
+    } if customer_ids else {}
+
+    return [
+        {
+            "_id": str(booking["_id"]),
+            "customer_name": customer_names.get(booking["customer_id"]),
+            "entity_name": booking.get("entity_snapshot", {}).get("name"),
+            "booking_date_range": booking["booking_date_range"],
+            "status": booking["status"]
+        }
+        for booking in bookings
+    ]
+
 @bookings_bp.route('/admin/bookings', methods=['GET'])
 @jwt_required()
 def get_all_bookings():
-    """Retrieve all bookings."""
+    """Retrieve bookings one keyset page at a time; pass `next_cursor` back as `after`."""
     try:
-        bookings = mongo.db['Bookings'].find()
-        booking_list = [
-            {
-                "_id": str(booking["_id"]),
-                "customer_name": mongo.db['User'].find_one({"_id": booking["customer_id"]})["full_name"],
-                "entity_name": mongo.db['VenueProvider'].find_one({"_id": booking["venue_id"]})["name_of_venue"]
-                if booking["venue_id"] else mongo.db['Vendors'].find_one({"_id": booking["vendor_id"]})["name"],
-                "booking_date_range": booking["booking_date_range"],
-                "status": booking["status"]
-            }
-            for booking in bookings
-        ]
-        return jsonify({"bookings": booking_list}), HttpCodes.HTTP_200_OK
+        if not check_if_admin():
+            return jsonify({"message": "Unauthorized access"}), HttpCodes.HTTP_403_NOT_VERIFIED
+
+        try:
+            # limit(0) means no limit to Mongo, so keep it at least 1
+            limit = min(max(int(request.args.get('limit', ADMIN_PAGE_SIZE)), 1), MAX_ADMIN_PAGE_SIZE)
+        except ValueError:
+            return jsonify({"message": "limit must be a number"}), HttpCodes.HTTP_400_BAD_REQUEST
+        after = request.args.get('after')
+        if after and not ObjectId.is_valid(after):
+            return jsonify({"message": "Invalid cursor"}), HttpCodes.HTTP_400_BAD_REQUEST
+
+        booking_list = fetch_admin_booking_page(after, limit)
+        next_cursor = booking_list[-1]["_id"] if len(booking_list) == limit else None
+        return jsonify({"bookings": booking_list, "next_cursor": next_cursor}), HttpCodes.HTTP_200_OK
     except Exception as e:
         return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
 
+@bookings_bp.route('/admin/bookings/export', methods=['GET'])
+@jwt_required()
+def export_all_bookings():
+    """Stream every booking as newline-delimited JSON, one page in memory at a time."""
+    if not check_if_admin():
+        return jsonify({"message": "Unauthorized access"}), HttpCodes.HTTP_403_NOT_VERIFIED
+
+    def generate():
+        after = None
+        while True:
+            booking_list = fetch_admin_booking_page(after, MAX_ADMIN_PAGE_SIZE)
+            for booking in booking_list:
+                yield json.dumps(booking) + "\n"
+            if len(booking_list) < MAX_ADMIN_PAGE_SIZE:
+                break
+            after = booking_list[-1]["_id"]
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @bookings_bp.route('/customer-bookings', methods=['GET'])
 @jwt_required()
 def get_bookings_for_customer():
@@ -397,15 +475,14 @@ def get_bookings_for_customer():
             return jsonify({"message": "Permission denied"}), HttpCodes.HTTP_403_NOT_VERIFIED
         
         # Retrieve the customer's ID and email
-        customer_id = get_user_id_by_email(current_user.get('email'))
+        customer_id = get_current_user_id()
         if not customer_id:
             return jsonify({"message": "Customer not found"}), HttpCodes.HTTP_404_NOT_FOUND
 
-        # Find all bookings associated with this customer
+        # Find all bookings associated with this customer; entity details are embedded
         bookings = mongo.db['Bookings'].find({"customer_id": ObjectId(customer_id)})
 
         booking_list = []
-        
         for booking in bookings:
             # Base booking details
             booking_details = {
@@ -422,45 +499,11 @@ def get_bookings_for_customer():
                 },
                 "customer_id": str(booking["customer_id"]),
             }
-            venue_id = booking.get("venue_id")
-            # Fetch venue details if the booking is for a venue
-            if venue_id:
-                venue_details = mongo.db['VenueProvider'].find_one({"_id": venue_id})
-                venue_provider_details = mongo.db['User'].find_one({"_id": venue_details["created_by"]})
-                
-                booking_details["venue_details"] = {
-                    "name": venue_details['name_of_venue'],
-                    "city": venue_details['city'],
-                    "address": venue_details['address'],
-                    "state": venue_details['state'],
-                    "capacity": venue_details['capacity'],
-                    "size": venue_details['size'],
-                    "description": venue_details['place_description']
-                } if venue_details else {}
-
-                booking_details["venue_provider_details"] = {
-                    "full_name": venue_provider_details['full_name'],
-                    "email": venue_provider_details['email']
-                } if venue_provider_details else {}
-
-            # Fetch vendor details if the booking is for a vendor
-            elif booking.get("vendor_id"):
-                vendor_details = mongo.db['Vendors'].find_one({"_id": booking["vendor_id"]})
-                vendor_provider_details = mongo.db['User'].find_one({"_id": vendor_details['created_by']})
-
-                booking_details["vendor_details"] = {
-                    "name": vendor_details['name'],
-                    "city": vendor_details['city'],
-                    "address": vendor_details['address'],
-                    "state": vendor_details['state'],
-                    "description": vendor_details['description'],
-                    "door_to_door_service": vendor_details['door_to_door_service']
-                } if vendor_details else {}
-
-                booking_details["vendor_provider_details"] = {
-                    "full_name": vendor_provider_details['full_name'],
-                    "email": vendor_provider_details['email']
-                } if vendor_provider_details else {}
+
+            if booking.get("venue_id") or booking.get("vendor_id"):
+                entity_type = 'venue' if booking.get("venue_id") else 'vendor'
+                booking_details[f"{entity_type}_details"] = booking.get("entity_snapshot", {})
+                booking_details[f"{entity_type}_provider_details"] = booking.get("owner_snapshot", {})
 
             booking_list.append(booking_details)
 
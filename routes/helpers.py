@@ -1,15 +1,85 @@
-from flask import jsonify
+import calendar
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from bson import ObjectId
+from config import Config
+from flask import g, jsonify
 from flask_jwt_extended import get_jwt_identity
+from models import mongo
 from werkzeug.utils import secure_filename
 from services.image_upload_service import ImageUploadingService
 from utils import HttpCodes
 
 image_upload_service = ImageUploadingService()
+# Shared by all requests so concurrent uploads stay bounded process-wide
+image_upload_pool = ThreadPoolExecutor(max_workers=Config.IMAGE_UPLOAD_WORKERS)
 
 def upload_image(file):
     secure_name = secure_filename(file.filename)
     return image_upload_service.upload_image(file=file.read(), file_name=secure_name)
 
+def upload_images(files):
+    """Upload several files concurrently and return their URLs in the order given."""
+    # Read the request streams here; only the network calls run in the pool
+    uploads = [(file.read(), secure_filename(file.filename)) for file in files]
+    futures = [
+        image_upload_pool.submit(image_upload_service.upload_image, file=content, file_name=name)
+        for content, name in uploads
+    ]
+    return [future.result() for future in futures]
+
+def generate_date_range(start_date, end_date):
+    """Generate a list of dates between start_date and end_date inclusive."""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+def get_date_window(args):
+    """
+    Read an availability window from query args: either `month` (YYYY-MM) or
+    `from`/`to` (YYYY-MM-DD, inclusive). Without either, the window starts
+    today and is open-ended. Raises ValueError on malformed dates.
+    """
+    month = args.get('month')
+    if month:
+        start = datetime.strptime(month, "%Y-%m")
+        last_day = calendar.monthrange(start.year, start.month)[1]
+        return start.strftime("%Y-%m-%d"), start.replace(day=last_day).strftime("%Y-%m-%d")
+
+    date_from = args.get('from') or datetime.utcnow().strftime("%Y-%m-%d")
+    date_to = args.get('to')
+    datetime.strptime(date_from, "%Y-%m-%d")
+    if date_to:
+        datetime.strptime(date_to, "%Y-%m-%d")
+    return date_from, date_to
+
+def get_current_user_id():
+    """
+    Return the logged-in user's id as a string. Tokens carry it in their
+    identity; older tokens without it fall back to a single lookup by email
+    that is cached for the rest of the request.
+    A token's id is not checked against the User collection, so it outlives
+    a deleted account; routes that create data for the user should call
+    get_current_user() instead and treat None as not found.
+    """
+    identity = get_jwt_identity()
+    if not isinstance(identity, dict):
+        return None
+    if identity.get('user_id'):
+        return identity['user_id']
+    if 'current_user_id' not in g:
+        # Imported here: every blueprint's routes import this module
+        from routes.venue_provider_bp.models import get_user_id_by_email
+        g.current_user_id = get_user_id_by_email(identity.get('email'))
+    return g.current_user_id
+
+def get_current_user():
+    """Return the logged-in user's document, loaded at most once per request."""
+    if 'current_user' not in g:
+        user_id = get_current_user_id()
+        g.current_user = mongo.db['User'].find_one({"_id": ObjectId(user_id)}) if user_id else None
+    return g.current_user
+
 def check_user_type(required_type):
     current_user = get_jwt_identity()
     
@@ -52,6 +52,32 @@ class HireRequest:
     def find_by_staff_id(staff_id):
         return list(mongo.db['HireRequests'].find({"staff_id": ObjectId(staff_id)}))
 
+    @staticmethod
+    def has_conflict(staff_id, requested_dates):
+        """True if any hire request for the staff member covers one of the dates."""
+        return mongo.db['HireRequests'].find_one(
+            {"staff_id": ObjectId(staff_id), "requested_dates": {"$in": requested_dates}},
+            {"_id": 1}
+        ) is not None
+
+    @staticmethod
+    def find_booked_dates(staff_id, date_from=None, date_to=None):
+        """Distinct requested dates for a staff member inside an optional inclusive window."""
+        window = {}
+        if date_from:
+            window["$gte"] = date_from
+        if date_to:
+            window["$lte"] = date_to
+
+        match = {"staff_id": ObjectId(staff_id)}
+        if window:
+            match["requested_dates"] = {"$elemMatch": window}
+        pipeline = [{"$match": match}, {"$unwind": "$requested_dates"}]
+        if window:
+            pipeline.append({"$match": {"requested_dates": window}})
+        pipeline += [{"$group": {"_id": "$requested_dates"}}, {"$sort": {"_id": 1}}]
+        return [date['_id'] for date in mongo.db['HireRequests'].aggregate(pipeline)]
+
     @staticmethod
     def find_by_hirer_id(hirer_id):
         return list(mongo.db['HireRequests'].find({"hirer_id": ObjectId(hirer_id)}))
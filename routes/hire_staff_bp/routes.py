@@ -2,30 +2,19 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from .models import HireRequest
 from models import mongo
-from decorator import validate_hiring_permission
+from decorator import rate_limit, validate_hiring_permission
 from services.email_service import send_hire_notification, send_hire_status_notification
 from routes.staff_bp.models import Staff
 from routes.users_bp.models import User
-from routes.venue_provider_bp.models import get_user_id_by_email
+from routes.helpers import generate_date_range, get_current_user, get_current_user_id, get_date_window
 from utils import HttpCodes
 from bson import ObjectId
-from datetime import datetime, timedelta
 
 hiring_staff_bp = Blueprint('hiring_staff_bp', __name__)
 
-def generate_date_range(start_date, end_date):
-    """Generate a list of dates between start_date and end_date inclusive."""
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
-
 def check_staff_availability(staff_id, requested_dates):
     """Check if the staff is already booked on any of the requested dates."""
-    existing_requests = HireRequest.find_by_staff_id(staff_id)
-    booked_dates = set()
-    for request in existing_requests:
-        booked_dates.update(request['requested_dates'])
-    return any(date in booked_dates for date in requested_dates)
+    return HireRequest.has_conflict(staff_id, requested_dates)
 
 @hiring_staff_bp.route('/customer/hire/<staff_id>', methods=['POST'])
 @jwt_required()
@@ -33,8 +22,8 @@ def check_staff_availability(staff_id, requested_dates):
 def customer_hire_staff(staff_id):
     current_user = get_jwt_identity()
     hirer_email = current_user["email"]
-    user_id = get_user_id_by_email(hirer_email)
-    user = mongo.db['User'].find_one({"_id": ObjectId(user_id)})
+    user = get_current_user()
+    user_id = str(user['_id'])
     hirer_name = user.get('full_name')
     hirer_type = user.get('user_type')
     
@@ -111,8 +100,8 @@ def customer_hire_staff(staff_id):
 def venue_provider_hire_staff(staff_id):
     current_user = get_jwt_identity()
     hirer_email = current_user["email"]
-    user_id = get_user_id_by_email(hirer_email)
-    user = mongo.db['User'].find_one({"_id": ObjectId(user_id)})
+    user = get_current_user()
+    user_id = str(user['_id'])
     hirer_name = user.get('full_name')
     hirer_type = user.get('user_type')
     
@@ -183,14 +172,16 @@ def venue_provider_hire_staff(staff_id):
         return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
 
 @hiring_staff_bp.route('/staff/<staff_id>/availability', methods=['GET'])
+@rate_limit(ip='120/minute')
 def check_staff_availability_api(staff_id):
-    """Public API to check the availability of staff, returns list of booked dates."""
-    existing_requests = HireRequest.find_by_staff_id(staff_id)
-    booked_dates = set()
-    for request in existing_requests:
-        booked_dates.update(request['requested_dates'])
-    
-    return jsonify({"booked_dates": list(booked_dates)}), HttpCodes.HTTP_200_OK
+    """Public API to check the availability of staff, returns booked dates within a `from`/`to` or `month` window."""
+    try:
+        date_from, date_to = get_date_window(request.args)
+    except ValueError:
+        return jsonify({"error": "Use 'month' as YYYY-MM or 'from'/'to' as YYYY-MM-DD"}), HttpCodes.HTTP_400_BAD_REQUEST
+
+    booked_dates = HireRequest.find_booked_dates(staff_id, date_from, date_to)
+    return jsonify({"booked_dates": booked_dates}), HttpCodes.HTTP_200_OK
 
 @hiring_staff_bp.route('/hire_request/<hire_request_id>/accept', methods=['GET'])
 @jwt_required()
@@ -212,9 +203,7 @@ def accept_hire_request(hire_request_id):
         HireRequest.update_status(hire_request_id, "accepted")
         
         # Get the current staff member's email and ID
-        staff_email = get_jwt_identity().get("email")
-        staff_id = get_user_id_by_email(staff_email)
-        staff_details = mongo.db['User'].find_one({"_id": ObjectId(staff_id)})
+        staff_details = get_current_user()
         
         # Check if staff details were found
         if not staff_details:
@@ -261,9 +250,7 @@ def reject_hire_request(hire_request_id):
         HireRequest.update_status(hire_request_id, "rejected")
 
         # Fetch hire request details
-        staff_email = get_jwt_identity().get("email")
-        staff_id = get_user_id_by_email(staff_email)
-        staff_details = mongo.db['User'].find_one({"_id": ObjectId(staff_id)})
+        staff_details = get_current_user()
         staff_name = staff_details.get('full_name')
 
         hirer_id = hire_request["hirer_id"]
@@ -282,8 +269,7 @@ def reject_hire_request(hire_request_id):
 @hiring_staff_bp.route('/hire_requests_by_hirer_id', methods=['GET'])
 @jwt_required()
 def get_hire_requests_by_hirer_id():
-    current_user = get_jwt_identity()
-    hirer_id = get_user_id_by_email(current_user["email"])
+    hirer_id = get_current_user_id()
 
     try:
         # Filter hire requests by hirer_id
@@ -324,8 +310,7 @@ def get_hire_requests_by_hirer_id():
 @jwt_required()
 @validate_hiring_permission(user_type_required='STAFF')
 def get_hire_requests():
-    current_user = get_jwt_identity()
-    user_id = get_user_id_by_email(current_user["email"])
+    user_id = get_current_user_id()
     staff_id = mongo.db['Staff'].find_one({"user_id": ObjectId(user_id)})
     
     try:
@@ -4,8 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from .models import PaymentMethod
 from utils import HttpCodes
 from bson import ObjectId
-from models import mongo
-from routes.helpers import is_customer, is_venue_provider
+from routes.helpers import get_current_user, get_current_user_id, is_customer, is_venue_provider
 
 
 payment_method_bp = Blueprint('payment_method_bp', __name__)
@@ -14,15 +13,17 @@ payment_method_bp = Blueprint('payment_method_bp', __name__)
 @jwt_required()
 def add_payment_method():
     """Add a new payment method for the logged-in user."""
-    current_user_email = get_jwt_identity()
-    current_user = mongo.db['User'].find_one({"email": current_user_email['email']})
+    user = get_current_user()
+    if user is None:
+        return jsonify({"error": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
+    user_id = str(user['_id'])
 
     # if not is_customer(current_user) or not is_venue_provider(current_user):
     #     return jsonify({"message": "Access denied. Only customers and venue providers can add payment methods."}), HttpCodes.HTTP_403_NOT_VERIFIED
 
     data = request.json
     payment_method = PaymentMethod(
-        user_id=str(current_user['_id']),
+        user_id=user_id,
         user_type=data['user_type'],
         card_holder_name=data['card_holder_name'],
         card_number=data['card_number'],
@@ -41,15 +42,14 @@ def add_payment_method():
 def get_payment_methods():
     """Get all payment methods for the logged-in user."""
     try:
-        current_user_email = get_jwt_identity()
-        current_user = mongo.db['User'].find_one({"email": current_user_email['email']})
-        if current_user is None:
+        user_id = get_current_user_id()
+        if user_id is None:
             return jsonify({"error": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
 
         # if not is_customer(current_user):
         #     return jsonify({"message": "Access denied. Only customers can view payment methods."}), HttpCodes.HTTP_403_NOT_VERIFIED
 
-        payment_methods = PaymentMethod.find_by_user_id(str(current_user['_id']))
+        payment_methods = PaymentMethod.find_by_user_id(user_id)
         if payment_methods:
             return jsonify({"payment_methods": payment_methods}), HttpCodes.HTTP_200_OK
         else:
@@ -61,8 +61,8 @@ def get_payment_methods():
 @jwt_required()
 def update_payment_method(payment_id):
     """Update an existing payment method for the logged-in user."""
-    current_user_email = get_jwt_identity()
-    current_user = mongo.db['User'].find_one({"email": current_user_email['email']})
+    # The user type is carried by the token identity
+    current_user = get_jwt_identity()
 
     if not is_customer(current_user):
         return jsonify({"message": "Access denied. Only customers can update payment methods."}), HttpCodes.HTTP_403_NOT_VERIFIED
@@ -78,8 +78,8 @@ def update_payment_method(payment_id):
 @jwt_required()
 def delete_payment_method(payment_id):
     """Delete a payment method for the logged-in user."""
-    current_user_email = get_jwt_identity()
-    current_user = mongo.db['User'].find_one({"email": current_user_email['email']})
+    # The user type is carried by the token identity
+    current_user = get_jwt_identity()
 
     if not is_customer(current_user):
         return jsonify({"message": "Access denied. Only customers can delete payment methods."}), HttpCodes.HTTP_403_NOT_VERIFIED
@@ -3,7 +3,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from utils import HttpCodes
 from services.payment_service import PaymentIntentService
-from routes.users_bp.models import User
+from routes.helpers import get_current_user, get_current_user_id
 from .models import Payment, PayedVenues
 
 payments_bp = Blueprint('payments_bp', __name__)
@@ -28,7 +28,7 @@ def create_payment_intent():
         if email != logged_in_email:
             return jsonify({"message": "Unauthorized: Email mismatch"}), HttpCodes.HTTP_403_NOT_VERIFIED
 
-        user = User.find_by_email(logged_in_email)
+        user = get_current_user()
 
         if not user:
             return jsonify({"message": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
@@ -66,13 +66,12 @@ def get_all_payments():
 @jwt_required()
 def get_user_payments():
     try:
-        logged_in_email = get_jwt_identity()
-        user = User.find_by_email(logged_in_email)
+        user_id = get_current_user_id()
 
-        if not user:
+        if not user_id:
             return jsonify({"message": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
 
-        payments = Payment.find_by_user_id(user['_id'])
+        payments = Payment.find_by_user_id(user_id)
 
         return jsonify(payments), HttpCodes.HTTP_200_OK
 
@@ -1,11 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import *
-from routes.helpers import upload_image
-from routes.venue_provider_bp.models import get_user_id_by_email
+from routes.helpers import get_current_user_id, upload_image
 from .models import Staff
 from utils import HttpCodes
 from bson import ObjectId
+from decorator import rate_limit
 
 staff_bp = Blueprint('staff_bp', __name__)
 
@@ -16,7 +16,7 @@ def add_staff_data():
     if current_user['user_type'] != 'STAFF':
         return jsonify({"message": "Permission denied!"}), HttpCodes.HTTP_403_NOT_VERIFIED
     
-    user_id = get_user_id_by_email(current_user['email'])
+    user_id = get_current_user_id()
     
     # Ensure the user_id is valid
     if not user_id or len(user_id) != 24:
@@ -107,6 +107,7 @@ def get(staff_id):
         return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
 
 @staff_bp.route('/get-all-staff-members-details', methods=['GET'])
+@rate_limit(ip='60/minute')
 def get_all_staff_data():
     try:
         staffs = Staff.find_all()
@@ -1,11 +1,11 @@
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.password_service import hash_password, check_password
 from models import mongo
 from bson import ObjectId
 
 class User:
     def __init__(self, email, password, full_name, username, user_type, verification_code):
         self.email = email
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
         self.full_name = full_name
         self.username = username
         self.user_type = user_type
@@ -39,7 +39,20 @@ class User:
         
     @staticmethod
     def verify_password(stored_password, provided_password):
-        return check_password_hash(stored_password, provided_password)
+        matches, _ = check_password(stored_password, provided_password)
+        return matches
+
+    @staticmethod
+    def update_password_hash(user_id, old_hash, new_hash):
+        """Swap in an upgraded hash, unless the password changed in the meantime."""
+        try:
+            return mongo.db['User'].update_one(
+                {"_id": ObjectId(user_id), "password": old_hash},
+                {"$set": {"password": new_hash}}
+            )
+        except Exception as e:
+            print(str(e))
+            return e
     
     @staticmethod
     def get_by_id(user_id):
@@ -1,19 +1,52 @@
+import time
+import click
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from services.auth_service import generate_access_token
 from services.email_service import send_verification_email
 from services.verification_service import generate_verification_code
-from werkzeug.security import generate_password_hash
+from services.password_service import PasswordHasherBusy, check_password, hash_password
 from .models import *
-from routes.bookings_bp.models import Notification
-from routes.venue_provider_bp.models import get_user_id_by_email
+from routes.bookings_bp.models import Booking, Notification
+from routes.helpers import get_current_user, get_current_user_id
 from utils import HttpCodes
 from bson import ObjectId
 from routes.staff_bp.models import Staff
+from decorator import rate_limit
 
 users_bp = Blueprint('users_bp', __name__)
 
+@users_bp.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(e):
+    response = jsonify({"message": "Server is busy, please try again shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, HttpCodes.HTTP_503_SERVICE_UNAVAILABLE
+
+@users_bp.cli.command('bench-login')
+@click.option('--count', default=200, help='Number of password checks to run.')
+def bench_login(count):
+    """Report password checks per second per hashing thread at the configured cost."""
+    stored_hash = hash_password('benchmark-password')
+    concurrency = max(1, min(count, Config.PASSWORD_HASH_MAX_PENDING))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(lambda _: check_password(stored_hash, 'benchmark-password'), range(count)))
+    elapsed = time.perf_counter() - start
+
+    # With no workers the hashes run inline on the calling threads
+    if Config.PASSWORD_HASH_WORKERS > 0:
+        threads, mode = Config.PASSWORD_HASH_WORKERS, f"{Config.PASSWORD_HASH_WORKERS} workers"
+    else:
+        threads, mode = concurrency, f"inline on {concurrency} threads"
+    rate = count / elapsed
+    print(f"{Config.PASSWORD_HASH_METHOD}: {rate:.1f} logins/s {mode}, "
+          f"{rate / threads:.1f} logins/s per thread")
+
 @users_bp.route('/signup', methods=['POST'])
+@rate_limit(ip='10/hour', account='3/hour')
 def signup():
     data = request.json
     existing_user = User.find_by_email(data['email'])
@@ -49,17 +82,26 @@ def signup():
     }), HttpCodes.HTTP_201_OK
 
 @users_bp.route('/login', methods=['POST'])
+@rate_limit(ip='30/minute', account='10/minute')
 def login():
     data = request.json
     user = User.find_by_email(data['email'])
     
-    if not user or not User.verify_password(user['password'], data['password']):
+    if not user:
+        return jsonify({"message": "Invalid credentials"}), HttpCodes.HTTP_401_UNAUTHORIZED
+
+    matches, new_hash = check_password(user['password'], data['password'])
+    if not matches:
         return jsonify({"message": "Invalid credentials"}), HttpCodes.HTTP_401_UNAUTHORIZED
 
+    if new_hash:
+        # The configured hash method or cost changed since this hash was made
+        User.update_password_hash(user['_id'], user['password'], new_hash)
+
     if not user['is_verified']:
         return jsonify({"message": "Email not verified"}), HttpCodes.HTTP_403_NOT_VERIFIED
 
-    token = generate_access_token(user['email'])
+    token = generate_access_token(user)
 
     user_info = {
         "email": user['email'],
@@ -78,8 +120,7 @@ def login():
 @jwt_required()
 def update_user():
     """Update user details for the logged-in user."""
-    current_user_email = get_jwt_identity()
-    current_user = User.find_by_email(current_user_email['email'])
+    current_user = get_current_user()
 
     if not current_user:
         return jsonify({"message": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
@@ -105,6 +146,8 @@ def update_user():
     )
 
     if result.matched_count > 0:
+        # Keep the owner details embedded on bookings in sync
+        Booking.refresh_owner_snapshot(current_user['_id'], update_data)
         return jsonify({"message": "User details updated successfully"}), HttpCodes.HTTP_200_OK
     return jsonify({"error": "Failed to update user details"}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
     
@@ -112,18 +155,18 @@ def update_user():
 @jwt_required()
 def verify_password():
     data = request.json
-    current_user_email = get_jwt_identity()
-    user = User.find_by_email(current_user_email['email'])
+    user = get_current_user()
 
     if not user:
         return jsonify({"message": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
 
-    if not check_password_hash(user['password'], data['password']):
+    if not User.verify_password(user['password'], data['password']):
         return jsonify({"message": "Invalid password"}), HttpCodes.HTTP_401_UNAUTHORIZED
 
     return jsonify({"message": "Password verified successfully"}), HttpCodes.HTTP_200_OK
 
 @users_bp.route('/get_vcode', methods=['POST'])
+@rate_limit(ip='10/hour', account='3/hour')
 def get_verification_code():
     data = request.json
     user = User.find_by_email(data['email'])
@@ -172,7 +215,7 @@ def reset_password():
         return jsonify({"message": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
 
     if user['is_verified'] == True:
-        new_password_hash = generate_password_hash(data['password'])
+        new_password_hash = hash_password(data['password'])
         mongo.db['User'].update_one(
             {"email": data['email']},
             {"$set": {"password": new_password_hash}}
@@ -218,15 +261,14 @@ def delete_user():
     if 'password' not in data:
         return jsonify({"message": "Password is required"}), HttpCodes.HTTP_400_BAD_REQUEST
 
-    # Get current user's email and find user document
-    current_user_email = get_jwt_identity()
-    current_user = User.find_by_email(current_user_email)
+    # Find the logged-in user's document
+    current_user = get_current_user()
 
     if not current_user:
         return jsonify({"message": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
 
     # Verify the provided password
-    if not check_password_hash(current_user['password'], data['password']):
+    if not User.verify_password(current_user['password'], data['password']):
         return jsonify({"message": "Incorrect password"}), HttpCodes.HTTP_401_UNAUTHORIZED
 
     # Delete user from the 'User' collection
@@ -243,29 +285,50 @@ def delete_user():
     else:
         return jsonify({"error": "Failed to delete user"}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
     
+NOTIFICATION_PAGE_SIZE = 20
+MAX_NOTIFICATION_PAGE_SIZE = 100
+
+@users_bp.cli.command('rebuild-notification-counters')
+def rebuild_notification_counters():
+    """Recompute every user's unread notification counter from their inbox."""
+    rebuilt = Notification.rebuild_unread_counters()
+    print(f"Rebuilt unread counters for {rebuilt} users")
+
 @users_bp.route('/notifications', methods=['GET'])
 @jwt_required()
 def get_notifications():
+    """Newest-first inbox, one keyset page at a time; pass `next_cursor` back as `after`."""
     try:
-        current_user = get_jwt_identity()
-        user_id = get_user_id_by_email(current_user.get('email'))
+        user_id = get_current_user_id()
         is_read = request.args.get('is_read')
         is_read = True if is_read == 'true' else False if is_read == 'false' else None
-
-        notifications = Notification.find_by_user_id(user_id, is_read=is_read)
-        if notifications:
-            return jsonify({"notifications": notifications}), HttpCodes.HTTP_200_OK
-        else:
-            return jsonify({"notifications": []}), HttpCodes.HTTP_400_BAD_REQUEST
+        try:
+            # A limit of 0 would load the whole inbox, so keep it at least 1
+            limit = min(max(int(request.args.get('limit', NOTIFICATION_PAGE_SIZE)), 1), MAX_NOTIFICATION_PAGE_SIZE)
+            notifications, next_cursor = Notification.find_by_user_id(
+                user_id, is_read=is_read, after=request.args.get('after'), limit=limit
+            )
+        except ValueError as e:
+            return jsonify({"message": str(e)}), HttpCodes.HTTP_400_BAD_REQUEST
+        return jsonify({"notifications": notifications, "next_cursor": next_cursor}), HttpCodes.HTTP_200_OK
     except Exception as e:
         return jsonify({"message": "Failed to get notification.", "error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
+
+@users_bp.route('/notifications/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_notification_count():
+    """Badge count from the per-user counter, without loading the inbox."""
+    try:
+        return jsonify({"unread": Notification.unread_count(get_current_user_id())}), HttpCodes.HTTP_200_OK
+    except Exception as e:
+        return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
     
 @users_bp.route('/notifications/<notification_id>/read', methods=['PATCH'])
 @jwt_required()
 def mark_notification_as_read(notification_id):
     try:
-        result = Notification.mark_as_read(notification_id)
-        if result.modified_count == 0:
+        result = Notification.mark_as_read(notification_id, get_current_user_id())
+        if not result:
             return jsonify({"message": "Notification not found or already marked as read"}), HttpCodes.HTTP_404_NOT_FOUND
 
         return jsonify({"message": "Notification marked as read"}), HttpCodes.HTTP_200_OK
@@ -275,15 +338,12 @@ def mark_notification_as_read(notification_id):
 @users_bp.route('/notifications/read-all', methods=['PATCH'])
 @jwt_required()
 def mark_all_notifications_as_read():
-    user_id = get_jwt_identity()
+    user_id = get_current_user_id()
     try:
-        result = mongo.db['Notifications'].update_many(
-            {"user_id": ObjectId(user_id), "is_read": False},
-            {"$set": {"is_read": True}}
-        )
-        if result.modified_count == 0:
+        modified_count = Notification.mark_all_as_read(user_id)
+        if modified_count == 0:
             return jsonify({"message": "No unread notifications found"}), HttpCodes.HTTP_404_NOT_FOUND
 
-        return jsonify({"message": f"{result.modified_count} notifications marked as read"}), HttpCodes.HTTP_200_OK
+        return jsonify({"message": f"{modified_count} notifications marked as read"}), HttpCodes.HTTP_200_OK
     except Exception as e:
         return jsonify({"error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
\ No newline at end of file
@@ -1,9 +1,14 @@
 from flask_pymongo import PyMongo
 from bson import ObjectId
+from pymongo import UpdateOne
 from models import mongo
 
+# Vendors at this version carry their pictures on the Vendors document; older
+# ones are read from VendorPictures until `migrate-embedded` has run.
+EMBEDDED_SCHEMA_VERSION = 2
+
 class Vendor:
-    def __init__(self, category, subcategory, name, city, state, zip_code, address, door_to_door_service, description, created_by, cover_picture=None):
+    def __init__(self, category, subcategory, name, city, state, zip_code, address, door_to_door_service, description, created_by, cover_picture=None, vendor_pictures=None):
         self.category = category
         self.subcategory = subcategory
         self.name = name
@@ -15,6 +20,7 @@ class Vendor:
         self.description = description
         self.cover_picture = cover_picture
         self.created_by = created_by
+        self.vendor_pictures = vendor_pictures or []
 
     def save(self):
         vendor_data = {
@@ -28,7 +34,9 @@ class Vendor:
             "door_to_door_service": self.door_to_door_service,
             "description": self.description,
             "cover_picture": self.cover_picture,
-            "created_by": self.created_by
+            "created_by": self.created_by,
+            "vendor_pictures": self.vendor_pictures,
+            "schema_version": EMBEDDED_SCHEMA_VERSION
         }
         try:
             result = mongo.db['Vendors'].insert_one(vendor_data)
@@ -37,6 +45,49 @@ class Vendor:
             print(str(e))
             return e
 
+    @staticmethod
+    def migrate_to_embedded(batch_size=200):
+        """
+        Copy VendorPictures rows onto vendors that predate the embedded schema.
+        Writes only apply while a vendor is still unmigrated, so the migration
+        is safe alongside live updates and resumable. Returns the number migrated.
+        """
+        migrated = 0
+        last_id = None
+        while True:
+            query = {"schema_version": {"$ne": EMBEDDED_SCHEMA_VERSION}}
+            if last_id:
+                query["_id"] = {"$gt": last_id}
+            vendor_ids = [vendor['_id'] for vendor in mongo.db['Vendors'].find(query, {"_id": 1}).sort("_id", 1).limit(batch_size)]
+            if not vendor_ids:
+                return migrated
+            last_id = vendor_ids[-1]
+
+            pictures = VendorPicture.find_by_vendor_ids(vendor_ids)
+            result = mongo.db['Vendors'].bulk_write([
+                UpdateOne(
+                    {"_id": vendor_id, "schema_version": {"$ne": EMBEDDED_SCHEMA_VERSION}},
+                    {"$set": {"vendor_pictures": pictures.get(str(vendor_id), []), "schema_version": EMBEDDED_SCHEMA_VERSION}}
+                )
+                for vendor_id in vendor_ids
+            ], ordered=False)
+            migrated += result.modified_count
+
+    @staticmethod
+    def purge_legacy_pictures(batch_size=500):
+        """Delete VendorPictures rows of vendors already on the embedded schema."""
+        purged = 0
+        last_id = None
+        while True:
+            query = {"schema_version": EMBEDDED_SCHEMA_VERSION}
+            if last_id:
+                query["_id"] = {"$gt": last_id}
+            vendor_ids = [vendor['_id'] for vendor in mongo.db['Vendors'].find(query, {"_id": 1}).sort("_id", 1).limit(batch_size)]
+            if not vendor_ids:
+                return purged
+            last_id = vendor_ids[-1]
+            purged += mongo.db['VendorPictures'].delete_many({"vendor_id": {"$in": vendor_ids}}).deleted_count
+
     @staticmethod
     def find_all():
         try:
@@ -58,9 +109,29 @@ class Vendor:
             return e
 
     @staticmethod
-    def update(vendor_id, update_data):
+    def update_changed(vendor_id, changes):
+        """
+        Write only the fields in `changes` that differ from the stored vendor;
+        fields left out, including vendor_pictures, are kept as stored. A
+        vendor that predates the embedded schema is migrated in the same write.
+        Returns the dict of fields written, or None if the vendor does not exist.
+        """
         try:
-            return mongo.db['Vendors'].update_one({'_id': ObjectId(vendor_id)}, {'$set': update_data})
+            vendor = mongo.db['Vendors'].find_one({"_id": ObjectId(vendor_id)})
+            if not vendor:
+                return None
+
+            legacy = vendor.get('schema_version') != EMBEDDED_SCHEMA_VERSION
+            diff = {field: value for field, value in changes.items() if vendor.get(field) != value}
+            if legacy:
+                if 'vendor_pictures' not in diff:
+                    diff['vendor_pictures'] = VendorPicture.find_by_vendor_id(vendor_id)
+                diff['schema_version'] = EMBEDDED_SCHEMA_VERSION
+            if diff:
+                mongo.db['Vendors'].update_one({'_id': ObjectId(vendor_id)}, {'$set': diff})
+            if legacy:
+                VendorPicture.delete_by_vendor_id(vendor_id)
+            return diff
         except Exception as e:
             print(str(e))
             return e
@@ -98,6 +169,14 @@ class VendorPicture:
             print(str(e))
             return e
 
+    @staticmethod
+    def find_by_vendor_ids(vendor_ids):
+        """Picture URLs for many vendors in one query, as {vendor_id: [url]}."""
+        pictures = {}
+        for picture in mongo.db['VendorPictures'].find({"vendor_id": {"$in": [ObjectId(vendor_id) for vendor_id in vendor_ids]}}):
+            pictures.setdefault(str(picture['vendor_id']), []).append(picture['image_url'])
+        return pictures
+
     @staticmethod
     def delete_by_vendor_id(vendor_id):
         try:
@@ -105,3 +184,22 @@ class VendorPicture:
         except Exception as e:
             print(str(e))
             return e
+
+def attach_vendor_pictures(vendors):
+    """
+    Set `venue_pictures` on each vendor: embedded vendors already carry them,
+    older ones are filled from VendorPictures with a single $in query.
+    """
+    legacy = []
+    for vendor in vendors:
+        if vendor.get('schema_version') == EMBEDDED_SCHEMA_VERSION:
+            vendor.pop('schema_version')
+            vendor['venue_pictures'] = vendor.pop('vendor_pictures', [])
+        else:
+            legacy.append(vendor)
+
+    if legacy:
+        pictures = VendorPicture.find_by_vendor_ids([vendor['_id'] for vendor in legacy])
+        for vendor in legacy:
+            vendor['venue_pictures'] = pictures.get(str(vendor['_id']), [])
+    return vendors
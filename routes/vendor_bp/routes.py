@@ -1,20 +1,45 @@
+import click
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from .models import *
-from routes.venue_provider_bp.routes import get_user_id_by_email
+from routes.bookings_bp.models import Booking
 from ..helpers import *
 from utils import HttpCodes
 
 vendor_bp = Blueprint('vendor_bp', __name__)
 
+# Form field -> stored field for the vendor's own text attributes
+VENDOR_FORM_FIELDS = {
+    'selectedCategory': 'category',
+    'subcategory': 'subcategory',
+    'name': 'name',
+    'city': 'city',
+    'state': 'state',
+    'zipCode': 'zip_code',
+    'address': 'address',
+    'description': 'description',
+}
+
+@vendor_bp.cli.command('migrate-embedded')
+@click.option('--purge-legacy', is_flag=True, help='Also delete picture rows of vendors that are already migrated.')
+def migrate_embedded(purge_legacy):
+    """Embed pictures into vendors that predate it."""
+    migrated = Vendor.migrate_to_embedded()
+    print(f"Migrated {migrated} vendors")
+    if purge_legacy:
+        print(f"Deleted {Vendor.purge_legacy_pictures()} legacy picture rows")
+
 @vendor_bp.route('/create', methods=['POST'])
 @jwt_required()
 def create_vendor():
     auth_check = check_user_type('VENDOR')
     if auth_check:
         return auth_check
-    current_user = get_jwt_identity()
-    user_id = get_user_id_by_email(current_user.get('email'))
+    # Loaded rather than read from the token, so a deleted account can't create vendors
+    user = get_current_user()
+    if not user:
+        return jsonify({"message": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
+    user_id = str(user['_id'])
     data = request.form
     files = request.files
 
@@ -26,7 +51,7 @@ def create_vendor():
             cover_picture_url = upload_image(files['coverPicture'])
 
         if 'vendor_pictures' in files:
-            venue_pictures_urls = [upload_image(file) for file in request.files.getlist('vendor_pictures')]
+            venue_pictures_urls = upload_images(request.files.getlist('vendor_pictures'))
     except Exception as e:
         return jsonify({"message": "File upload failed", "error": str(e)}), HttpCodes.HTTP_400_BAD_REQUEST
 
@@ -42,15 +67,13 @@ def create_vendor():
             door_to_door_service=data.get('doorToDoorService') == 'true',
             description=data.get('description'),
             cover_picture=cover_picture_url,
-            created_by=user_id
+            created_by=user_id,
+            vendor_pictures=venue_pictures_urls
         )
         vendor_id = vendor.save()
 
         if isinstance(vendor_id, Exception):
             return jsonify({"message": "Error in Creating Vendor", "error": str(vendor_id)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
-
-        for url in venue_pictures_urls:
-            VendorPicture(vendor_id=vendor_id, image_url=url).save()
             
         return jsonify({"message": "Successfully Created"}), HttpCodes.HTTP_201_OK
 
@@ -61,10 +84,7 @@ def create_vendor():
 @jwt_required()
 def get_vendors():
     try:
-        vendors = Vendor.find_all()
-        for vendor in vendors:
-            vendor_id = vendor['_id']
-            vendor['venue_pictures'] = VendorPicture.find_by_vendor_id(vendor_id)
+        vendors = attach_vendor_pictures(Vendor.find_all())
         return jsonify(vendors), HttpCodes.HTTP_200_OK
 
     except Exception as e:
@@ -77,7 +97,7 @@ def get_vendor(vendor_id):
         vendor = Vendor.find_by_id(vendor_id)
         if not vendor:
             return jsonify({"message": "Vendor not found"}), HttpCodes.HTTP_404_NOT_FOUND
-        vendor['venue_pictures'] = VendorPicture.find_by_vendor_id(vendor_id)
+        attach_vendor_pictures([vendor])
         return jsonify(vendor), HttpCodes.HTTP_200_OK
     except Exception as e:
         return jsonify({"message": "Error in Fetching Vendor", "error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
@@ -92,40 +112,29 @@ def update_vendor(vendor_id):
     data = request.form
     files = request.files
 
-    cover_picture_url = None
-    venue_pictures_urls = []
+    # Only fields the client sent are considered; everything else stays as stored
+    update_data = {field: data.get(key) for key, field in VENDOR_FORM_FIELDS.items() if key in data}
+    if 'doorToDoorService' in data:
+        update_data['door_to_door_service'] = data.get('doorToDoorService') == 'true'
 
     try:
         if 'coverPicture' in files:
-            cover_picture_url = upload_image(files['coverPicture'])
+            update_data['cover_picture'] = upload_image(files['coverPicture'])
 
         if 'vendor_pictures' in files:
-            venue_pictures_urls = [upload_image(file) for file in request.files.getlist('vendor_pictures')]
+            update_data['vendor_pictures'] = upload_images(request.files.getlist('vendor_pictures'))
     except Exception as e:
         return jsonify({"message": "File upload failed", "error": str(e)}), HttpCodes.HTTP_400_BAD_REQUEST
 
     try:
-        update_data = {
-            "category": data.get('selectedCategory'),
-            "subcategory": data.get('subcategory'),
-            "name": data.get('name'),
-            "city": data.get('city'),
-            "state": data.get('state'),
-            "zip_code": data.get('zipCode'),
-            "address": data.get('address'),
-            "door_to_door_service": data.get('doorToDoorService') == 'true',
-            "description": data.get('description'),
-            "cover_picture": cover_picture_url
-        }
-
-        result = Vendor.update(vendor_id, update_data)
+        result = Vendor.update_changed(vendor_id, update_data)
 
         if isinstance(result, Exception):
-            return jsonify({"message": "Error in Updating Vendor", "error": str(result)}), 
-
-        VendorPicture.delete_by_vendor_id(vendor_id)
-        for url in venue_pictures_urls:
-            VendorPicture(vendor_id=vendor_id, image_url=url).save()
+            return jsonify({"message": "Error in Updating Vendor", "error": str(result)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
+        if result is None:
+            return jsonify({"message": "Vendor not found"}), HttpCodes.HTTP_404_NOT_FOUND
+        # Bookings embed a snapshot of the vendor; copy the changed fields onto them
+        Booking.refresh_entity_snapshot('vendor', vendor_id, result)
             
         return jsonify({"message": "Successfully Updated"}), HttpCodes.HTTP_200_OK
 
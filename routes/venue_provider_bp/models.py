@@ -1,7 +1,14 @@
 from flask_pymongo import PyMongo
 from bson import ObjectId
+from pymongo import UpdateOne
 from models import mongo
 
+# Venues at this version carry pricing, amenities, additional services and
+# pictures on the VenueProvider document itself. Older documents keep them in
+# the child collections until `migrate-embedded` has run, and are read from
+# there in the meantime.
+EMBEDDED_SCHEMA_VERSION = 2
+
 def get_user_id_by_email(email):
     """Retrieve the user ID based on the provided email."""
     try:
@@ -15,7 +22,8 @@ def get_user_id_by_email(email):
         return None
 
 class VenueProvider:
-    def __init__(self, name_of_venue, website, type_of_property, city, address, state, capacity, size, pin_location, place_description, created_by, cover_picture=None, other_property_type=None):
+    def __init__(self, name_of_venue, website, type_of_property, city, address, state, capacity, size, pin_location, place_description, created_by, cover_picture=None, other_property_type=None,
+                 pricing=None, amenities=None, additional_services=None, venue_pictures=None):
         self.name_of_venue = name_of_venue
         self.website = website
         self.type_of_property = type_of_property
@@ -29,6 +37,10 @@ class VenueProvider:
         self.pin_location = pin_location
         self.place_description = place_description
         self.created_by = created_by
+        self.pricing = pricing or {}
+        self.amenities = amenities or []
+        self.additional_services = additional_services or []
+        self.venue_pictures = venue_pictures or []
 
     def save(self):
         venue_data = {
@@ -44,7 +56,8 @@ class VenueProvider:
             "size": self.size,
             "pin_location": self.pin_location,
             "place_description": self.place_description,
-            "created_by": self.created_by
+            "created_by": self.created_by,
+            **VenueProvider.embedded_fields(self.pricing, self.amenities, self.additional_services, self.venue_pictures)
         }
         try:
             result = mongo.db['VenueProvider'].insert_one(venue_data)
@@ -53,6 +66,134 @@ class VenueProvider:
             print(str(e))
             return e
     
+    @staticmethod
+    def embedded_fields(pricing, amenities, additional_services, venue_pictures):
+        """Embedded child data as stored on the venue; pricing is kept as a list of {type, price}."""
+        return {
+            "pricing": [{"type": type, "price": price} for type, price in (pricing or {}).items()],
+            "amenities": list(amenities or []),
+            "additional_services": list(additional_services or []),
+            "venue_pictures": list(venue_pictures or []),
+            "schema_version": EMBEDDED_SCHEMA_VERSION
+        }
+
+    @staticmethod
+    def migrate_to_embedded(batch_size=200):
+        """
+        Copy child rows onto venues that predate the embedded schema. Each
+        write only applies while the venue is still unmigrated, so the
+        migration can run alongside live updates and be resumed at any point.
+        Returns the number of venues migrated.
+        """
+        migrated = 0
+        last_id = None
+        while True:
+            query = {"schema_version": {"$ne": EMBEDDED_SCHEMA_VERSION}}
+            if last_id:
+                query["_id"] = {"$gt": last_id}
+            venue_ids = [venue['_id'] for venue in mongo.db['VenueProvider'].find(query, {"_id": 1}).sort("_id", 1).limit(batch_size)]
+            if not venue_ids:
+                return migrated
+            last_id = venue_ids[-1]
+
+            pricing = VenuePricing.find_by_venue_ids(venue_ids)
+            amenities = VenueAmenity.find_by_venue_ids(venue_ids)
+            services = VenueAdditionalService.find_by_venue_ids(venue_ids)
+            pictures = VenuePictures.find_by_venue_ids(venue_ids)
+            result = mongo.db['VenueProvider'].bulk_write([
+                UpdateOne(
+                    {"_id": venue_id, "schema_version": {"$ne": EMBEDDED_SCHEMA_VERSION}},
+                    {"$set": VenueProvider.embedded_fields(
+                        pricing.get(str(venue_id)), amenities.get(str(venue_id)),
+                        services.get(str(venue_id)), pictures.get(str(venue_id))
+                    )}
+                )
+                for venue_id in venue_ids
+            ], ordered=False)
+            migrated += result.modified_count
+
+    @staticmethod
+    def purge_legacy_children(batch_size=500):
+        """Delete child rows of venues already on the embedded schema; run once no old readers remain."""
+        purged = 0
+        last_id = None
+        while True:
+            query = {"schema_version": EMBEDDED_SCHEMA_VERSION}
+            if last_id:
+                query["_id"] = {"$gt": last_id}
+            venue_ids = [venue['_id'] for venue in mongo.db['VenueProvider'].find(query, {"_id": 1}).sort("_id", 1).limit(batch_size)]
+            if not venue_ids:
+                return purged
+            last_id = venue_ids[-1]
+            for collection in ('VenuePricing', 'VenueAmenities', 'VenueAdditionalServices', 'VenuePictures'):
+                purged += mongo.db[collection].delete_many({"venue_id": {"$in": venue_ids}}).deleted_count
+
+    @staticmethod
+    def search(filters, sort, skip, limit, count=False, facets=False, count_limit=None):
+        """
+        Filter venues on the embedded schema and return (venues, has_more,
+        total, facets) for one page of raw documents. The total match count
+        and, with `facets`, counts by city, property type and amenity are
+        only computed on request, since they read every match. `count_limit`
+        caps how many are read, for the facets too; a total above it means
+        the cap was reached and the facets miss the rest.
+        `filters` keys: city, state, type_of_property, min/max_capacity,
+        min/max_size, amenities (all required), min/max_price and price_type.
+        """
+        query = {}
+        for field in ('city', 'state', 'type_of_property'):
+            if filters.get(field):
+                query[field] = filters[field]
+        for field in ('capacity', 'size'):
+            bounds = {}
+            if filters.get(f'min_{field}') is not None:
+                bounds['$gte'] = filters[f'min_{field}']
+            if filters.get(f'max_{field}') is not None:
+                bounds['$lte'] = filters[f'max_{field}']
+            if bounds:
+                query[field] = bounds
+        if filters.get('amenities'):
+            query['amenities'] = {'$all': filters['amenities']}
+
+        # Price bounds have to hold for the same pricing entry, hence $elemMatch
+        price = {}
+        if filters.get('min_price') is not None:
+            price['price'] = {'$gte': filters['min_price']}
+        if filters.get('max_price') is not None:
+            price.setdefault('price', {})['$lte'] = filters['max_price']
+        if price or filters.get('price_type'):
+            if filters.get('price_type'):
+                price['type'] = filters['price_type']
+            query['pricing'] = {'$elemMatch': price}
+
+        # One extra row tells whether another page follows without counting
+        venues = list(mongo.db['VenueProvider'].find(query).sort(sort).skip(skip).limit(limit + 1))
+        has_more = len(venues) > limit
+        if not count and not facets:
+            return venues[:limit], has_more, None, {}
+
+        counts = {"total": [{"$count": "count"}]}
+        if facets:
+            counts.update({
+                "city": [{"$sortByCount": "$city"}],
+                "type_of_property": [{"$sortByCount": "$type_of_property"}],
+                "amenities": [{"$unwind": "$amenities"}, {"$sortByCount": "$amenities"}]
+            })
+        pipeline = [{"$match": query}]
+        if count_limit:
+            pipeline.append({"$limit": count_limit + 1})
+        pipeline += [
+            {"$project": {"city": 1, "type_of_property": 1, "amenities": 1}},
+            {"$facet": counts}
+        ]
+        result = next(mongo.db['VenueProvider'].aggregate(pipeline))
+        total = result.pop('total')
+        facet_counts = {
+            name: [{"value": bucket['_id'], "count": bucket['count']} for bucket in buckets]
+            for name, buckets in result.items()
+        }
+        return venues[:limit], has_more, total[0]['count'] if total else 0, facet_counts
+
     @staticmethod
     def find_by_id(venue_id):
         try:
@@ -74,9 +215,43 @@ class VenueProvider:
             return e
 
     @staticmethod
-    def update(venue_id, update_data):
+    def update_changed(venue_id, changes):
+        """
+        Write only the fields in `changes` that differ from the stored venue.
+        `changes` holds parent fields and any of pricing ({type: price}),
+        amenities, additional_services and venue_pictures; fields left out are
+        kept as stored. A venue that predates the embedded schema is migrated
+        in the same write and its child rows removed. Returns the dict of
+        fields written, or None if the venue does not exist.
+        """
         try:
-            return mongo.db['VenueProvider'].update_one({'_id': ObjectId(venue_id)}, {'$set': update_data})
+            venue = mongo.db['VenueProvider'].find_one({"_id": ObjectId(venue_id)})
+            if not venue:
+                return None
+
+            legacy = venue.get('schema_version') != EMBEDDED_SCHEMA_VERSION
+            if legacy:
+                attach_venue_details([venue])
+                embedded = VenueProvider.embedded_fields(
+                    changes.pop('pricing', venue['pricing']),
+                    changes.pop('amenities', venue['amenities']),
+                    changes.pop('additional_services', venue['additionalServices']),
+                    changes.pop('venue_pictures', venue['venuePictures'])
+                )
+            else:
+                if 'pricing' in changes:
+                    changes['pricing'] = [{"type": type, "price": price} for type, price in changes['pricing'].items()]
+                embedded = {}
+
+            diff = {field: value for field, value in changes.items() if venue.get(field) != value}
+            # A legacy venue gets all embedded fields at once, marking it migrated
+            diff.update(embedded)
+            if diff:
+                mongo.db['VenueProvider'].update_one({'_id': ObjectId(venue_id)}, {'$set': diff})
+            if legacy:
+                for collection in ('VenuePricing', 'VenueAmenities', 'VenueAdditionalServices', 'VenuePictures'):
+                    mongo.db[collection].delete_many({"venue_id": ObjectId(venue_id)})
+            return diff
         except Exception as e:
             print(str(e))
             return e
@@ -116,6 +291,14 @@ class VenuePricing:
             print(str(e))
             return e
 
+    @staticmethod
+    def find_by_venue_ids(venue_ids):
+        """Pricing for many venues in one query, as {venue_id: {type: price}}."""
+        pricing = {}
+        for item in mongo.db['VenuePricing'].find({"venue_id": {"$in": [ObjectId(venue_id) for venue_id in venue_ids]}}):
+            pricing.setdefault(str(item['venue_id']), {})[item['type']] = item['price']
+        return pricing
+
     @staticmethod
     def delete_by_venue_id(venue_id):
         try:
@@ -149,6 +332,14 @@ class VenuePictures:
             print(str(e))
             return e
 
+    @staticmethod
+    def find_by_venue_ids(venue_ids):
+        """Picture URLs for many venues in one query, as {venue_id: [url]}."""
+        pictures = {}
+        for picture in mongo.db['VenuePictures'].find({"venue_id": {"$in": [ObjectId(venue_id) for venue_id in venue_ids]}}):
+            pictures.setdefault(str(picture['venue_id']), []).append(picture['image_url'])
+        return pictures
+
     @staticmethod
     def delete_by_venue_id(venue_id):
         try:
@@ -182,6 +373,14 @@ class VenueAdditionalService:
             print(str(e))
             return e
 
+    @staticmethod
+    def find_by_venue_ids(venue_ids):
+        """Additional services for many venues in one query, as {venue_id: [service]}."""
+        services = {}
+        for service in mongo.db['VenueAdditionalServices'].find({"venue_id": {"$in": [ObjectId(venue_id) for venue_id in venue_ids]}}):
+            services.setdefault(str(service['venue_id']), []).append(service['service'])
+        return services
+
     @staticmethod
     def delete_by_venue_id(venue_id):
         try:
@@ -215,6 +414,14 @@ class VenueAmenity:
             print(str(e))
             return e
 
+    @staticmethod
+    def find_by_venue_ids(venue_ids):
+        """Amenities for many venues in one query, as {venue_id: [amenity]}."""
+        amenities = {}
+        for amenity in mongo.db['VenueAmenities'].find({"venue_id": {"$in": [ObjectId(venue_id) for venue_id in venue_ids]}}):
+            amenities.setdefault(str(amenity['venue_id']), []).append(amenity['amenity'])
+        return amenities
+
     @staticmethod
     def delete_by_venue_id(venue_id):
         try:
@@ -222,3 +429,35 @@ class VenueAmenity:
         except Exception as e:
             print(str(e))
             return e
+
+def attach_venue_details(venues):
+    """
+    Fill in pricing, amenities, additional services and pictures for a list
+    of venues. Embedded venues already carry them; venues that predate the
+    embedded schema are filled with one $in query per child collection.
+    """
+    legacy = []
+    for venue in venues:
+        if venue.get('schema_version') == EMBEDDED_SCHEMA_VERSION:
+            venue.pop('schema_version')
+            venue['pricing'] = {item['type']: item['price'] for item in venue.get('pricing', [])}
+            venue['amenities'] = venue.get('amenities', [])
+            venue['additionalServices'] = venue.pop('additional_services', [])
+            venue['venuePictures'] = venue.pop('venue_pictures', [])
+        else:
+            legacy.append(venue)
+
+    venue_ids = [venue['_id'] for venue in legacy]
+    if not venue_ids:
+        return venues
+    pricing = VenuePricing.find_by_venue_ids(venue_ids)
+    amenities = VenueAmenity.find_by_venue_ids(venue_ids)
+    services = VenueAdditionalService.find_by_venue_ids(venue_ids)
+    pictures = VenuePictures.find_by_venue_ids(venue_ids)
+    for venue in legacy:
+        venue_id = str(venue['_id'])
+        venue['pricing'] = pricing.get(venue_id, {})
+        venue['amenities'] = amenities.get(venue_id, [])
+        venue['additionalServices'] = services.get(venue_id, [])
+        venue['venuePictures'] = pictures.get(venue_id, [])
+    return venues
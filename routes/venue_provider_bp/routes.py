@@ -1,22 +1,52 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from utils import HttpCodes
 import json
+import click
 from .models import *
+from routes.bookings_bp.models import Booking
 from ..helpers import *
 
 venue_provider_bp = Blueprint('venue_provider_bp', __name__)
 
+# Form field -> stored field for the venue's own (non-embedded) attributes
+VENUE_FORM_FIELDS = {
+    'firstName': 'first_name',
+    'lastName': 'last_name',
+    'email': 'email',
+    'phone': 'phone',
+    'id': 'id',
+    'nameOfVenue': 'name_of_venue',
+    'website': 'website',
+    'typeOfProperty': 'type_of_property',
+    'otherPropertyType': 'other_property_type',
+    'city': 'city',
+    'address': 'address',
+    'state': 'state',
+    'capacity': 'capacity',
+    'size': 'size',
+    'pinLocation': 'pin_location',
+    'placeDescription': 'place_description',
+}
+
+@venue_provider_bp.cli.command('migrate-embedded')
+@click.option('--purge-legacy', is_flag=True, help='Also delete child rows of venues that are already migrated.')
+def migrate_embedded(purge_legacy):
+    """Embed pricing, amenities, services and pictures into venues that predate it."""
+    migrated = VenueProvider.migrate_to_embedded()
+    print(f"Migrated {migrated} venues")
+    if purge_legacy:
+        print(f"Deleted {VenueProvider.purge_legacy_children()} legacy child rows")
+
 @venue_provider_bp.route('/postdata', methods=['POST'])
 @jwt_required()
 def create_venue_provider():
-    user_info = get_jwt_identity()
-    user_email = user_info.get('email')  # Extract the email from the JWT identity
-    # Get the user ID based on the email
-    user_id = get_user_id_by_email(user_email)
+    # Loaded rather than read from the token, so a deleted account can't create venues
+    user = get_current_user()
     
-    if not user_id:
+    if not user:
         return jsonify({"message": "User not found"}), HttpCodes.HTTP_404_NOT_FOUND
+    user_id = str(user['_id'])
     auth_check = check_user_type('VENUE_PROVIDER')
     if auth_check:
         return auth_check
@@ -31,7 +61,7 @@ def create_venue_provider():
             cover_picture_url = upload_image(files['coverPicture'])
 
         if 'venuePictures' in files:
-            venue_pictures_urls = [upload_image(file) for file in request.files.getlist('venuePictures')]
+            venue_pictures_urls = upload_images(request.files.getlist('venuePictures'))
 
     except Exception as e:
         return jsonify({"message": "File upload failed", "error": str(e)}), HttpCodes.HTTP_400_BAD_REQUEST
@@ -50,32 +80,17 @@ def create_venue_provider():
             size=int(data.get('size')),
             pin_location=data.get('pinLocation'),
             place_description=data.get('placeDescription'),
-            created_by=user_id
+            created_by=user_id,
+            # Pricing, amenities, services and pictures are embedded in the same insert
+            pricing=json.loads(data.get('pricing')),
+            amenities=data.getlist('amenities'),
+            additional_services=data.getlist('additionalServices'),
+            venue_pictures=venue_pictures_urls
         )
         venue_provider_id = venue_provider.save()
 
         if isinstance(venue_provider_id, Exception):
             return jsonify({"message": "Error in Creating Venue", "error": str(venue_provider_id)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
-    
-        # Save additional services
-        additional_services = data.getlist('additionalServices')
-        for service in additional_services:
-            VenueAdditionalService(venue_id=venue_provider_id, service=service).save()
-
-        # Save amenities
-        amenities = data.getlist('amenities')
-        for amenity in amenities:
-            VenueAmenity(venue_id=venue_provider_id, amenity=amenity).save()
-
-        # Save pricing
-        pricing = json.loads(data.get('pricing'))
-        if pricing:
-            for type, price in pricing.items():
-                VenuePricing(venue_id=venue_provider_id, type=type, price=price).save()
-
-        # Save venue pictures
-        for url in venue_pictures_urls:
-            VenuePictures(venue_id=venue_provider_id, image_url=url).save()
         
         return jsonify({"message": "Successfully Created"}), HttpCodes.HTTP_201_OK
 
@@ -87,25 +102,83 @@ def create_venue_provider():
 def get_venue_providers():
     try:
         venues = VenueProvider.find_all()
-        for venue in venues:
-            venue_id = venue['_id']
-
-            # Fetch related pricing
-            venue['pricing'] = VenuePricing.find_by_venue_id(venue_id)
+        # Related pricing, amenities, services and pictures for every venue in four queries
+        attach_venue_details(venues)
 
-            # Fetch related amenities
-            venue['amenities'] = VenueAmenity.find_by_venue_id(venue_id)
+        return jsonify(venues), HttpCodes.HTTP_200_OK
 
-            # Fetch related additional services
-            venue['additionalServices'] = VenueAdditionalService.find_by_venue_id(venue_id)
+    except Exception as e:
+        return jsonify({"message": "Error in Fetching Venues", "error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
 
-            # Fetch related pictures
-            venue['venuePictures'] = VenuePictures.find_by_venue_id(venue_id)
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+# Most matches read to compute a requested total or facets
+SEARCH_COUNT_LIMIT = 10000
+# Sort option -> index-friendly sort keys, always ending on _id so pages are stable
+SEARCH_SORTS = {
+    'newest': [('_id', -1)],
+    'capacity': [('capacity', 1), ('_id', 1)],
+    '-capacity': [('capacity', -1), ('_id', -1)],
+    'size': [('size', 1), ('_id', 1)],
+    '-size': [('size', -1), ('_id', -1)],
+    'name': [('name_of_venue', 1), ('_id', 1)],
+}
+
+@venue_provider_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_venues():
+    """
+    Search venues by city, state, type, capacity/size ranges, required
+    amenities and price bounds, one page at a time; `has_more` tells whether
+    another page follows. Pass `count=true` for the total match count and
+    `facets=true` for counts by city, property type and amenity. Both read
+    at most SEARCH_COUNT_LIMIT matches; `total_capped` and `facets_capped`
+    say the result stopped there and covers only part of the matches.
+    """
+    args = request.args
+    try:
+        def number(name, cast=int):
+            return cast(args[name]) if args.get(name) else None
+
+        filters = {
+            'city': args.get('city'),
+            'state': args.get('state'),
+            'type_of_property': args.get('type'),
+            'min_capacity': number('min_capacity'),
+            'max_capacity': number('max_capacity'),
+            'min_size': number('min_size'),
+            'max_size': number('max_size'),
+            'amenities': [amenity for value in args.getlist('amenities') for amenity in value.split(',') if amenity],
+            'min_price': number('min_price', float),
+            'max_price': number('max_price', float),
+            'price_type': args.get('price_type'),
+        }
+        sort = SEARCH_SORTS.get(args.get('sort', 'newest'))
+        if sort is None:
+            return jsonify({"message": f"sort must be one of {', '.join(SEARCH_SORTS)}"}), HttpCodes.HTTP_400_BAD_REQUEST
+        page = max(int(args.get('page', 1)), 1)
+        limit = min(max(int(args.get('limit', SEARCH_PAGE_SIZE)), 1), MAX_SEARCH_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"message": "Numeric filters, page and limit must be numbers"}), HttpCodes.HTTP_400_BAD_REQUEST
 
-        return jsonify(venues), HttpCodes.HTTP_200_OK
+    try:
+        want_facets = args.get('facets') == 'true'
+        venues, has_more, total, facets = VenueProvider.search(
+            filters, sort, (page - 1) * limit, limit,
+            count=args.get('count') == 'true', facets=want_facets, count_limit=SEARCH_COUNT_LIMIT
+        )
+        venues = attach_venue_details([{**venue, '_id': str(venue['_id'])} for venue in venues])
+        response = {"venues": venues, "has_more": has_more, "page": page, "limit": limit}
+        if total is not None:
+            response["total"] = min(total, SEARCH_COUNT_LIMIT)
+            response["total_capped"] = total > SEARCH_COUNT_LIMIT
+        if want_facets:
+            response["facets"] = facets
+            response["facets_capped"] = total > SEARCH_COUNT_LIMIT
+        return jsonify(response), HttpCodes.HTTP_200_OK
 
     except Exception as e:
-        return jsonify({"message": "Error in Fetching Venues", "error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
+        return jsonify({"message": "Error in Searching Venues", "error": str(e)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
 
 @venue_provider_bp.route('/get/makeup/<venue_provider_id>', methods=['GET'])
 @jwt_required()
@@ -115,19 +188,7 @@ def get_venue_provider(venue_provider_id):
         if not venue:
             return jsonify({"message": "Venue not found"}), HttpCodes.HTTP_404_NOT_FOUND
 
-        venue_id = venue['_id']
-
-        # Fetch related pricing
-        venue['pricing'] = VenuePricing.find_by_venue_id(venue_id)
-
-        # Fetch related amenities
-        venue['amenities'] = VenueAmenity.find_by_venue_id(venue_id)
-
-        # Fetch related additional services
-        venue['additionalServices'] = VenueAdditionalService.find_by_venue_id(venue_id)
-
-        # Fetch related pictures
-        venue['venuePictures'] = VenuePictures.find_by_venue_id(venue_id)
+        attach_venue_details([venue])
 
         return jsonify(venue), HttpCodes.HTTP_200_OK
 
@@ -140,64 +201,34 @@ def update_venue_provider(venue_id):
     data = request.form
     files = request.files
 
-    cover_picture_url = None
-    venue_pictures_urls = []
-
     try:
-        if 'coverPicture' in files:
-            cover_picture_url = upload_image(files['coverPicture'])
+        # Only fields the client sent are considered; everything else stays as stored
+        update_data = {field: data.get(key) for key, field in VENUE_FORM_FIELDS.items() if key in data}
+        for field in ('capacity', 'size'):
+            if field in update_data:
+                update_data[field] = int(update_data[field])
 
+        if 'coverPicture' in files:
+            update_data['cover_picture'] = upload_image(files['coverPicture'])
         if 'venuePictures' in files:
-            venue_pictures_urls = [upload_image(file) for file in request.files.getlist('venuePictures')]
-
-        update_data = {
-            "first_name": data.get('firstName'),
-            "last_name": data.get('lastName'),
-            "email": data.get('email'),
-            "phone": data.get('phone'),
-            "id": data.get('id'),
-            "name_of_venue": data.get('nameOfVenue'),
-            "website": data.get('website'),
-            "cover_picture": cover_picture_url,
-            "type_of_property": data.get('typeOfProperty'),
-            "other_property_type": data.get('otherPropertyType'),
-            "city": data.get('city'),
-            "address": data.get('address'),
-            "state": data.get('state'),
-            "capacity": int(data.get('capacity')),
-            "size": int(data.get('size')),
-            "pin_location": data.get('pinLocation'),
-            "place_description": data.get('placeDescription'),
-        }
+            update_data['venue_pictures'] = upload_images(request.files.getlist('venuePictures'))
 
-        result = VenueProvider.update(venue_id, update_data)
+        # Send the key with an empty value to clear a list
+        if 'amenities' in data:
+            update_data['amenities'] = [amenity for amenity in data.getlist('amenities') if amenity]
+        if 'additionalServices' in data:
+            update_data['additional_services'] = [service for service in data.getlist('additionalServices') if service]
+        if 'pricing' in data:
+            update_data['pricing'] = json.loads(data.get('pricing')) or {}
+
+        result = VenueProvider.update_changed(venue_id, update_data)
 
         if isinstance(result, Exception):
             return jsonify({"message": "Error in Updating Venue", "error": str(result)}), HttpCodes.HTTP_500_INTERNAL_SERVER_ERROR
-
-        # Update additional services
-        additional_services = data.getlist('additionalServices')
-        VenueAdditionalService.delete_by_venue_id(venue_id)
-        for service in additional_services:
-            VenueAdditionalService(venue_id=venue_id, service=service).save()
-
-        # Update amenities
-        amenities = data.getlist('amenities')
-        VenueAmenity.delete_by_venue_id(venue_id)
-        for amenity in amenities:
-            VenueAmenity(venue_id=venue_id, amenity=amenity).save()
-
-        # Update pricing
-        pricing = json.loads(data.get('pricing'))
-        VenuePricing.delete_by_venue_id(venue_id)
-        if pricing:
-            for type, price in pricing.items():
-                VenuePricing(venue_id=venue_id, type=type, price=price).save()
-
-        # Update venue pictures
-        VenuePictures.delete_by_venue_id(venue_id)
-        for url in venue_pictures_urls:
-            VenuePictures(venue_id=venue_id, image_url=url).save()
+        if result is None:
+            return jsonify({"message": "Venue not found"}), HttpCodes.HTTP_404_NOT_FOUND
+        # Bookings embed a snapshot of the venue; copy the changed fields onto them
+        Booking.refresh_entity_snapshot('venue', venue_id, result)
 
         return jsonify({"message": "Successfully Updated"}), HttpCodes.HTTP_200_OK
 
@@ -212,7 +243,7 @@ def delete_venue_provider(venue_id):
         if result.deleted_count == 0:
             return jsonify({"message": "Venue not found"}), HttpCodes.HTTP_404_NOT_FOUND
 
-        # Delete related records
+        # Delete related records left from before the venue was embedded
         VenuePricing.delete_by_venue_id(venue_id)
         VenueAmenity.delete_by_venue_id(venue_id)
         VenueAdditionalService.delete_by_venue_id(venue_id)
@@ -226,10 +257,12 @@ def delete_venue_provider(venue_id):
 @jwt_required()
 def get_venues_grouped_by_user():
     try:
-        current_user = get_jwt_identity()
-        user_id = get_user_id_by_email(current_user.get('email'))
+        user_id = get_current_user_id()
 
-        venues = mongo.db['VenueProvider'].find({"created_by": user_id})
+        # The listing has never included child data, so leave the embedded fields out
+        venues = mongo.db['VenueProvider'].find({"created_by": user_id}, {
+            "pricing": 0, "amenities": 0, "additional_services": 0, "venue_pictures": 0, "schema_version": 0
+        })
         # Format the venues to include the _id as a string
         venues = [{**venue, '_id': str(venue['_id'])} for venue in venues]
         # Return the grouped venues
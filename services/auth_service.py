@@ -1,10 +1,14 @@
 from flask_jwt_extended import create_access_token as jwt_create_access_token, get_jwt_identity
 from routes.users_bp.models import User
 
-def generate_access_token(email):
-    user = User.find_by_email(email)
+def generate_access_token(user):
+    """Issue a token whose identity carries everything routes need to skip a user lookup."""
     if user:
-        return jwt_create_access_token(identity={"email": user['email'], "user_type": user['user_type']})
+        return jwt_create_access_token(identity={
+            "email": user['email'],
+            "user_type": user['user_type'],
+            "user_id": str(user['_id'])
+        })
     return None
 
 def authenticate_user(email, password):
@@ -15,21 +19,13 @@ def authenticate_user(email, password):
 
 def check_if_admin():
     try:
-        # Get the current user's email from the JWT token
-        logged_in_email = get_jwt_identity()
-
-        # Find the user by their email
-        user = User.find_by_email(logged_in_email)
-
-        # If the user doesn't exist, return False
-        if not user:
+        # The token identity already carries the user's type
+        identity = get_jwt_identity()
+        if not isinstance(identity, dict):
             return False
 
         # Check if the user is an admin (assumed that 'user_type' indicates the role)
-        if user.get('user_type') == 'ADMIN':  # Adjust this according to your role structure
-            return True
-
-        return False
+        return identity.get('user_type') == 'ADMIN'  # Adjust this according to your role structure
     except Exception as e:
         print(f"Error in admin check: {str(e)}")
         return False
\ No newline at end of file
@@ -0,0 +1,53 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from models import mongo
+from utils import HttpCodes
+
+# Entity type a provider user type may act on bookings for
+ENTITY_BY_PROVIDER = {
+    'VENUE_PROVIDER': 'venue',
+    'VENDOR_PROVIDER': 'vendor',
+}
+
+class BookingTransitionError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def transition_booking(booking_id, user_type, provider_id, new_status):
+    """
+    Move a pending booking to `new_status` with a single conditional
+    find_one_and_update, so two concurrent accepts/rejects cannot both win.
+    Returns the updated booking projected to what notifications need.
+    Bookings not owned by `provider_id` are never matched.
+    Only when the update matches nothing is the booking read again, to tell
+    apart a missing booking, a permission problem and a finished request.
+    """
+    entity = ENTITY_BY_PROVIDER.get(user_type)
+    if not entity or not provider_id:
+        raise BookingTransitionError("Permission denied", HttpCodes.HTTP_403_NOT_VERIFIED)
+    owner_field = f"{entity}_provider_id"
+
+    booking = mongo.db['Bookings'].find_one_and_update(
+        {"_id": ObjectId(booking_id), "status": "pending", owner_field: ObjectId(provider_id)},
+        {"$set": {"status": new_status, "updated_at": datetime.utcnow()}},
+        projection={
+            "customer_id": 1,
+            "venue_id": 1,
+            "vendor_id": 1,
+            "booking_date_range": 1,
+            "entity_snapshot.name": 1,
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    if booking:
+        return booking
+
+    existing = mongo.db['Bookings'].find_one({"_id": ObjectId(booking_id)}, {"status": 1, owner_field: 1})
+    if not existing:
+        raise BookingTransitionError("Booking not found", HttpCodes.HTTP_404_NOT_FOUND)
+    if existing.get(owner_field) != ObjectId(provider_id):
+        raise BookingTransitionError("Permission denied", HttpCodes.HTTP_403_NOT_VERIFIED)
+    raise BookingTransitionError(f"Booking is already {existing['status']}", HttpCodes.HTTP_409_CONFLICT)
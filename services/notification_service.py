@@ -0,0 +1,106 @@
+import atexit
+import threading
+from config import Config
+from socketio_instance import socketio, user_room
+
+
+class NotificationDispatcher:
+    """
+    Buffers notifications and their socket events for a short window. Each
+    flush stores every buffered notification with one insert_many, then sends
+    each recipient a single frame: the event itself if there was only one, or
+    a 'notification_batch' of all of them in order. A batch that fails to
+    store is held back, events included, and retried on the next flush.
+    A flush_interval of 0 writes through: every dispatch flushes inline and
+    no background task is started.
+    """
+
+    def __init__(self, flush_interval, max_buffer, max_attempts=3):
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.documents = []
+        self.events = {}
+        self.failed_attempts = 0
+        self.flusher_started = False
+
+    def dispatch(self, user_id, event, payload, notification=None):
+        """Queue an event for a user, storing `notification` first when given."""
+        with self.lock:
+            if notification is not None:
+                document = notification.to_document()
+                self.documents.append(document)
+                payload = {**payload, 'notification_id': str(document['_id'])}
+            self.events.setdefault(str(user_id), []).append({'event': event, 'data': payload})
+            write_through = self.flush_interval <= 0
+            full = write_through or len(self.documents) >= self.max_buffer
+            start_flusher = not write_through and not self.flusher_started
+            self.flusher_started = self.flusher_started or start_flusher
+
+        if start_flusher:
+            socketio.start_background_task(self._run)
+        if full:
+            self.flush()
+
+    def defer(self, fn, *args):
+        """Run notification work after the response, or inline when writing through."""
+        if self.flush_interval <= 0:
+            # Failures stay out of the response, as they would in the background
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Notification task failed: {str(e)}")
+        else:
+            socketio.start_background_task(fn, *args)
+
+    def flush(self):
+        with self.lock:
+            documents, self.documents = self.documents, []
+            events, self.events = self.events, {}
+
+        # Stored before emitting, so a client that replays right away sees them
+        if documents:
+            # Imported here: the bookings routes import this module
+            from routes.bookings_bp.models import Notification
+            result = Notification.insert_many(documents)
+            if isinstance(result, Exception):
+                if self._requeue(documents, events):
+                    return
+                # Out of retries: tell connected users anyway, but these can't be replayed
+                print(f"Dropped {len(documents)} notifications after {self.max_attempts} failed inserts: "
+                      f"{', '.join(str(document['_id']) for document in documents)}")
+            else:
+                self.failed_attempts = 0
+        for user_id, user_events in events.items():
+            if len(user_events) == 1:
+                socketio.emit(user_events[0]['event'], user_events[0]['data'], namespace='/notifications', to=user_room(user_id))
+            else:
+                socketio.emit('notification_batch', {'events': user_events}, namespace='/notifications', to=user_room(user_id))
+
+    def _requeue(self, documents, events):
+        """Put a batch that failed to store back in front of the buffer; False once it has failed too often."""
+        with self.lock:
+            self.failed_attempts += 1
+            if self.failed_attempts >= self.max_attempts:
+                self.failed_attempts = 0
+                return False
+            self.documents = documents + self.documents
+            for user_id, user_events in self.events.items():
+                events.setdefault(user_id, []).extend(user_events)
+            self.events = events
+        print(f"Storing {len(documents)} notifications failed, retrying on the next flush")
+        return True
+
+    def _run(self):
+        while True:
+            socketio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Notification flush failed: {str(e)}")
+
+
+dispatcher = NotificationDispatcher(Config.NOTIFICATION_FLUSH_INTERVAL, Config.NOTIFICATION_MAX_BUFFER)
+# Don't lose what is still buffered when the process exits cleanly
+atexit.register(dispatcher.flush)
@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+from config import Config
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashes are already queued, or one waits longer than PASSWORD_HASH_TIMEOUT."""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_inline = Config.PASSWORD_HASH_WORKERS <= 0
+_pending = threading.BoundedSemaphore(Config.PASSWORD_HASH_MAX_PENDING)
+
+
+def _get_executor():
+    """
+    The shared hashing pool, or None to hash in the calling thread. Hosts
+    without working multiprocessing primitives (e.g. AWS Lambda has no
+    /dev/shm) fail to start a pool, so fall back to hashing inline there.
+    """
+    global _executor, _inline
+    if _executor is None and not _inline:
+        with _executor_lock:
+            if _executor is None and not _inline:
+                try:
+                    _executor = ProcessPoolExecutor(max_workers=Config.PASSWORD_HASH_WORKERS)
+                except (OSError, NotImplementedError) as e:
+                    print(f"Password hashing pool unavailable, hashing inline: {str(e)}")
+                    _inline = True
+    return _executor
+
+
+def _run(fn, *args):
+    """Run fn in the hashing pool, refusing work once the queue is full."""
+    if not _pending.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        executor = _get_executor()
+        if executor is not None:
+            future = executor.submit(fn, *args)
+    except Exception:
+        _pending.release()
+        raise
+    if executor is None:
+        try:
+            return fn(*args)
+        finally:
+            _pending.release()
+    future.add_done_callback(lambda _: _pending.release())
+    try:
+        return future.result(timeout=Config.PASSWORD_HASH_TIMEOUT)
+    except TimeoutError:
+        # The pool is backed up; the slot is freed once the hash finishes
+        raise PasswordHasherBusy()
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _check_and_rehash(stored_hash, password, method):
+    # Runs in a worker, so the rehash costs no extra round trip
+    if not check_password_hash(stored_hash, password):
+        return False, None
+    if stored_hash.split('$', 1)[0] != method:
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+def hash_password(password):
+    return _run(_hash, password, Config.PASSWORD_HASH_METHOD)
+
+
+def check_password(stored_hash, password):
+    """
+    Verify a password against its stored hash.
+
+    Returns (matches, new_hash), where new_hash is set when the stored hash
+    was made with a different method or cost than the configured one.
+    """
+    return _run(_check_and_rehash, stored_hash, password, Config.PASSWORD_HASH_METHOD)
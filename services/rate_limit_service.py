@@ -0,0 +1,130 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from models import mongo
+from models.indexes import ensure_collection_indexes
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_limit(limit):
+    """Turn '10/minute' into a bucket capacity and a refill rate in tokens per second."""
+    count, period = limit.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period.strip()]
+
+
+class MemoryBucketStore:
+    """
+    Token buckets held in this process; only correct with a single worker.
+    Keys come from client input, so buckets that have refilled are swept out
+    every `sweep_interval` seconds and the least recently used are dropped
+    beyond `max_buckets`. A dropped bucket comes back full, as it would have.
+    """
+
+    def __init__(self, max_buckets=100000, sweep_interval=60):
+        self.buckets = OrderedDict()
+        self.max_buckets = max_buckets
+        self.sweep_interval = sweep_interval
+        self.next_sweep = time.monotonic() + sweep_interval
+        self.lock = threading.Lock()
+
+    def _sweep(self, now):
+        self.buckets = OrderedDict(
+            (key, bucket) for key, bucket in self.buckets.items()
+            if bucket[0] + (now - bucket[1]) * bucket[3] < bucket[2]
+        )
+        self.next_sweep = now + self.sweep_interval
+
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+        with self.lock:
+            if now >= self.next_sweep:
+                self._sweep(now)
+            # Popped and re-added so the dict stays in least recently used order
+            tokens, updated, _, _ = self.buckets.pop(key, (capacity, now, capacity, rate))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now, capacity, rate)
+            while len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        if allowed:
+            return True, 0
+        return False, (1 - tokens) / rate
+
+
+class MongoBucketStore:
+    """
+    Token buckets shared by every worker. Each take is one atomic pipeline
+    update: refill by elapsed time, then spend a token if one is available.
+    """
+
+    collection = 'RateLimits'
+    _index_ready = False
+
+    def _ensure_index(self):
+        if not MongoBucketStore._index_ready:
+            ensure_collection_indexes(mongo.db[self.collection])
+            MongoBucketStore._index_ready = True
+
+    def take(self, key, capacity, rate):
+        self._ensure_index()
+        now = time.time()
+        expires_at = datetime.utcnow() + timedelta(seconds=capacity / rate)
+        pipeline = [
+            {"$set": {
+                "tokens": {"$min": [capacity, {"$add": [
+                    {"$ifNull": ["$tokens", capacity]},
+                    {"$multiply": [{"$subtract": [now, {"$ifNull": ["$updated", now]}]}, rate]}
+                ]}]},
+                "updated": now,
+                "expires_at": expires_at
+            }},
+            {"$set": {
+                "allowed": {"$gte": ["$tokens", 1]},
+                "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]}
+            }}
+        ]
+        try:
+            bucket = mongo.db[self.collection].find_one_and_update(
+                {"_id": key}, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Another worker created the bucket first; the retry updates it
+            bucket = mongo.db[self.collection].find_one_and_update(
+                {"_id": key}, pipeline, return_document=ReturnDocument.AFTER
+            )
+        if bucket['allowed']:
+            return True, 0
+        return False, (1 - bucket['tokens']) / rate
+
+
+_stores = {'memory': MemoryBucketStore, 'mongo': MongoBucketStore}
+_store = None
+
+
+def get_store(storage):
+    global _store
+    if _store is None:
+        _store = _stores[storage]()
+    return _store
+
+
+def check_limits(store, buckets):
+    """
+    Take one token from each (key, limit) bucket. Returns the number of
+    seconds to wait when any of them is empty, otherwise None.
+    """
+    retry_after = 0
+    for key, limit in buckets:
+        capacity, rate = parse_limit(limit)
+        allowed, wait = store.take(key, capacity, rate)
+        if not allowed:
+            retry_after = max(retry_after, wait)
+    return math.ceil(retry_after) if retry_after else None
@@ -1,11 +1,130 @@
-from flask_socketio import SocketIO
+import threading
+from datetime import timedelta
+import socketio as socketio_server
+from bson import ObjectId
+from flask import current_app, request
+from flask_jwt_extended import decode_token
+from flask_socketio import SocketIO, emit, join_room
 
 socketio = SocketIO(cors_allowed_origins="*")
 
+class LocalPubSubManager(socketio_server.PubSubManager):
+    """
+    In-process stand-in for a Redis/Kafka/AMQP backplane. Every manager on
+    the same channel in this process receives every published message, so
+    several Socket.IO servers can be exercised together without external
+    services. It does not cross process boundaries.
+    """
+    name = 'local'
+    _inboxes = {}
+    _lock = threading.Lock()
+
+    def __init__(self, url='local://', channel='flask-socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.inbox = None
+
+    def initialize(self):
+        # A queue from the server's async mode, so the listener's blocking get
+        # yields to other green threads under eventlet instead of freezing them
+        self.inbox = self.server.eio.create_queue()
+        with LocalPubSubManager._lock:
+            LocalPubSubManager._inboxes.setdefault(self.channel, []).append(self.inbox)
+        super().initialize()
+
+    def _publish(self, data):
+        with LocalPubSubManager._lock:
+            inboxes = list(LocalPubSubManager._inboxes.get(self.channel, []))
+        for inbox in inboxes:
+            inbox.put(data)
+
+    def _listen(self):
+        while True:
+            yield self.inbox.get()
+
+def init_socketio(app):
+    """
+    Attach Socket.IO to the app, fanning events out through the backplane in
+    SOCKETIO_MESSAGE_QUEUE so every worker can reach every connected client.
+    """
+    url = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    channel = app.config.get('SOCKETIO_CHANNEL', 'flask-socketio')
+    # Set explicitly: Flask-SocketIO would pick eventlet just because it is installed
+    async_mode = app.config.get('SOCKETIO_ASYNC_MODE', 'threading')
+    if not url:
+        socketio.init_app(app, async_mode=async_mode)
+    elif url.startswith('local://'):
+        socketio.init_app(app, async_mode=async_mode, client_manager=LocalPubSubManager(url, channel=channel))
+    else:
+        # redis://, kafka:// and amqp:// URLs are handled by Flask-SocketIO itself
+        socketio.init_app(app, async_mode=async_mode, message_queue=url, channel=channel)
+
+def user_room(user_id):
+    """Room every socket of a user joins, so events reach only that user."""
+    return f"user:{user_id}"
+
+def authenticate_socket(auth):
+    """Return the user id for the JWT sent in the Socket.IO auth payload or `token` query arg."""
+    token = (auth or {}).get('token') or request.args.get('token')
+    if not token:
+        return None
+    if token.startswith('Bearer '):
+        token = token[len('Bearer '):]
+    try:
+        identity = decode_token(token)['sub']
+    except Exception:
+        return None
+
+    if identity.get('user_id'):
+        return identity['user_id']
+    # Tokens issued before the id was part of the identity
+    from routes.venue_provider_bp.models import get_user_id_by_email
+    return get_user_id_by_email(identity.get('email'))
+
+def replay_notifications(user_id, last_notification_id, cursor=None):
+    """
+    Send the socket the notifications stored around and after the last one
+    it saw, in order, as a 'notification_replay' batch. The first batch
+    overlaps the last seen one by NOTIFICATION_REPLAY_OVERLAP seconds, so
+    clients should skip ids they already have. `has_more` asks the client to
+    send another 'replay' with the batch's `next_cursor`.
+    """
+    from routes.bookings_bp.models import Notification
+    if not cursor and (not last_notification_id or not ObjectId.is_valid(last_notification_id)):
+        return
+    limit = current_app.config.get('NOTIFICATION_REPLAY_LIMIT', 100)
+    overlap = timedelta(seconds=current_app.config.get('NOTIFICATION_REPLAY_OVERLAP', 5))
+    try:
+        notifications = Notification.find_since(user_id, last_notification_id, limit + 1, after=cursor, overlap=overlap)
+    except ValueError:
+        return
+    has_more = len(notifications) > limit
+    emit('notification_replay', {
+        'notifications': [
+            {**notification, 'created_at': notification['created_at'].isoformat()}
+            for notification in notifications[:limit]
+        ],
+        'has_more': has_more,
+        'next_cursor': Notification.encode_cursor(notifications[limit - 1]) if has_more else None
+    })
+
 @socketio.on('connect', namespace='/notifications')
-def handle_connect():
+def handle_connect(auth=None):
+    user_id = authenticate_socket(auth)
+    if not user_id:
+        # Refuse the connection rather than let it listen anonymously
+        return False
+    join_room(user_room(user_id))
+    # Remembered for 'replay' requests made later on this connection
+    request.environ['notifications.user_id'] = user_id
+    replay_notifications(user_id, (auth or {}).get('last_notification_id') or request.args.get('last_notification_id'))
     print("Client connected")
 
+@socketio.on('replay', namespace='/notifications')
+def handle_replay(data):
+    user_id = request.environ.get('notifications.user_id')
+    if user_id:
+        replay_notifications(user_id, (data or {}).get('last_notification_id'), (data or {}).get('cursor'))
+
 @socketio.on('disconnect', namespace='/notifications')
 def handle_disconnect():
-    print("Client disconnected")
\ No newline at end of file
+    print("Client disconnected")
@@ -0,0 +1,64 @@
+import os
+
+# Config and the service clients read these at import time; give them
+# placeholders when no .env is present
+for name in (
+    'MONGO_USERNAME', 'MONGO_PASSWORD', 'MONGO_CLUSTER', 'MONGO_AUTHSOURCE', 'MONGO_AUTHMECHANISM',
+    'JWT_SECRET_KEY', 'MAILJET_API_KEY', 'MAILJET_SECRET_KEY',
+    'IMAGEKIT_PUBLIC_KEY', 'IMAGEKIT_PRIVATE_KEY', 'IMAGEKIT_URL_ENDPOINT',
+    'STRIPE_TEST_PUBLISHABLE_KEY', 'STRIPE_TEST_SECRET_KEY'
+):
+    os.environ.setdefault(name, 'test')
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from models import mongo
+from models.query_plans import CommandRecorder
+from routes.bookings_bp.routes import bookings_bp
+
+# Scratch mongod the model tests run against; they are skipped when it is not reachable
+TEST_MONGO_URI = os.getenv('TEST_MONGO_URI', 'mongodb://localhost:27017')
+TEST_DATABASE = 'eeve_test'
+
+
+@pytest.fixture(scope='session')
+def command_recorder():
+    return CommandRecorder()
+
+
+@pytest.fixture(scope='session')
+def mongo_client(command_recorder):
+    client = MongoClient(TEST_MONGO_URI, serverSelectionTimeoutMS=2000, event_listeners=[command_recorder])
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"no mongod at {TEST_MONGO_URI}")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def db(mongo_client):
+    """An empty scratch database swapped in for mongo.db for the length of a test."""
+    mongo_client.drop_database(TEST_DATABASE)
+    original_db = getattr(mongo, 'db', None)
+    mongo.db = mongo_client[TEST_DATABASE]
+    try:
+        yield mongo.db
+    finally:
+        mongo.db = original_db
+        mongo_client.drop_database(TEST_DATABASE)
+
+
+@pytest.fixture
+def app():
+    """A bare app with the blueprints under test, so no startup work touches the real database."""
+    app = Flask(__name__)
+    app.config.update(TESTING=True, JWT_SECRET_KEY='test')
+    JWTManager(app)
+    app.register_blueprint(bookings_bp, url_prefix='/booking')
+    return app
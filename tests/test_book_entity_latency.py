@@ -0,0 +1,53 @@
+import statistics
+import time
+from datetime import date, timedelta
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+
+BOOKINGS = 200
+
+
+def seed_venue(db):
+    owner_id, customer_id, venue_id = ObjectId(), ObjectId(), ObjectId()
+    db['User'].insert_many([
+        {"_id": owner_id, "full_name": "Provider", "email": "provider@example.com", "user_type": "VENUE_PROVIDER"},
+        {"_id": customer_id, "full_name": "Customer", "email": "customer@example.com", "user_type": "CUSTOMER"},
+    ])
+    db['VenueProvider'].insert_one({"_id": venue_id, "name_of_venue": "Hall", "created_by": str(owner_id)})
+    return venue_id, customer_id
+
+
+def test_book_entity_latency(app, client, db, command_recorder, monkeypatch):
+    """Book one day at a time and report p50/p99; run with -s to see the numbers."""
+    monkeypatch.setattr('services.notification_service.socketio.start_background_task', lambda fn, *args: None)
+    venue_id, customer_id = seed_venue(db)
+    with app.app_context():
+        token = create_access_token(identity={
+            "email": "customer@example.com", "user_type": "CUSTOMER", "user_id": str(customer_id)
+        })
+
+    latencies, commands = [], []
+    first_day = date(2027, 1, 1)
+    for i in range(BOOKINGS):
+        command_recorder.commands = []
+        command_recorder.recording = True
+        start = time.perf_counter()
+        try:
+            response = client.post(
+                f'/booking/entities/venue/{venue_id}/book',
+                json={"customer_email": "customer@example.com", "booking_date_range": [str(first_day + timedelta(days=i))]},
+                headers={"Authorization": f"Bearer {token}"}
+            )
+        finally:
+            command_recorder.recording = False
+        latencies.append((time.perf_counter() - start) * 1000)
+        commands.append([command_name for command_name, _ in command_recorder.commands])
+        assert response.status_code == 201
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"\nbook_entity over {BOOKINGS} bookings: p50 {percentiles[49]:.1f} ms, p99 {percentiles[98]:.1f} ms")
+
+    # The work per booking does not grow with the bookings already on the
+    # calendar; the first one may also create the calendar index
+    assert all(request_commands == commands[-1] for request_commands in commands[1:])
+    assert db['Bookings'].count_documents({"venue_id": venue_id}) == BOOKINGS
@@ -0,0 +1,58 @@
+import threading
+from bson import ObjectId
+from routes.bookings_bp.models import BookingCalendar
+
+THREADS = 24
+
+
+def claim_concurrently(entity_id, date_ranges):
+    """Start one claim per date range at the same moment and return the results in order."""
+    barrier = threading.Barrier(len(date_ranges))
+    results = [None] * len(date_ranges)
+
+    def claim(i):
+        barrier.wait()
+        results[i] = BookingCalendar.claim('venue', entity_id, date_ranges[i])
+
+    threads = [threading.Thread(target=claim, args=(i,)) for i in range(len(date_ranges))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_same_days_are_claimed_once(db):
+    BookingCalendar._index_ready = False
+    venue_id = ObjectId()
+
+    results = claim_concurrently(venue_id, [['2026-03-10', '2026-03-11']] * THREADS)
+
+    assert results.count(True) == 1
+    assert BookingCalendar.booked_dates('venue', venue_id) == ['2026-03-10', '2026-03-11']
+
+
+def test_overlapping_ranges_never_double_book(db):
+    BookingCalendar._index_ready = False
+    venue_id = ObjectId()
+    # Each range overlaps its neighbours by one day
+    ranges = [[f"2026-05-{day:02d}", f"2026-05-{day + 1:02d}"] for day in range(1, THREADS + 1)]
+
+    results = claim_concurrently(venue_id, ranges)
+
+    won = [dates for dates, claimed in zip(ranges, results) if claimed]
+    held = [date for dates in won for date in dates]
+    assert len(held) == len(set(held))
+    assert BookingCalendar.booked_dates('venue', venue_id) == sorted(held)
+
+
+def test_first_claims_on_free_days_all_succeed(db):
+    # No calendar document exists yet, so every claim races to create it
+    BookingCalendar._index_ready = False
+    venue_id = ObjectId()
+    ranges = [[f"2027-01-{day:02d}"] for day in range(1, THREADS + 1)]
+
+    results = claim_concurrently(venue_id, ranges)
+
+    assert all(results)
+    assert BookingCalendar.booked_dates('venue', venue_id) == [dates[0] for dates in ranges]
@@ -0,0 +1,43 @@
+from bson import ObjectId
+from routes.bookings_bp.models import Notification
+
+
+def seed_inbox(db, user_id, unread):
+    """Notifications stored before unread counters existed."""
+    db['Notifications'].insert_many([
+        Notification(user_id, f"Old {i}", ObjectId()).to_document() for i in range(unread)
+    ])
+
+
+def test_save_seeds_a_missing_counter_from_the_inbox(db):
+    user_id = ObjectId()
+    seed_inbox(db, user_id, 3)
+
+    Notification(user_id, "New", ObjectId()).save()
+
+    assert Notification.unread_count(user_id) == 4
+
+
+def test_insert_many_seeds_only_missing_counters(db):
+    old_user, new_user = ObjectId(), ObjectId()
+    seed_inbox(db, old_user, 2)
+    Notification(new_user, "First", ObjectId()).save()
+
+    Notification.insert_many([
+        Notification(user_id, "Batch", ObjectId()).to_document() for user_id in (old_user, new_user, new_user)
+    ])
+
+    assert Notification.unread_count(old_user) == 3
+    assert Notification.unread_count(new_user) == 3
+
+
+def test_mark_as_read_seeds_a_missing_counter(db):
+    user_id = ObjectId()
+    seed_inbox(db, user_id, 3)
+    notification_id = db['Notifications'].find_one({"user_id": user_id})['_id']
+
+    Notification.mark_as_read(notification_id, user_id)
+    assert Notification.unread_count(user_id) == 2
+
+    Notification.mark_all_as_read(user_id)
+    assert Notification.unread_count(user_id) == 0
@@ -0,0 +1,30 @@
+import time
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from routes.bookings_bp.models import Notification
+
+
+@pytest.fixture
+def karachi_time(monkeypatch):
+    """Run with a server clock that is not UTC."""
+    monkeypatch.setenv('TZ', 'Asia/Karachi')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_cursor_round_trips_in_any_server_timezone(karachi_time):
+    notification = {"_id": ObjectId(), "created_at": datetime(2026, 5, 1, 12, 0, 0, 123000)}
+
+    created_at, notification_id = Notification.decode_cursor(Notification.encode_cursor(notification))
+
+    assert created_at == notification['created_at']
+    assert notification_id == notification['_id']
+
+
+@pytest.mark.parametrize('cursor', ['', 'abc', '123', '123_notanid', 'x_' + str(ObjectId()), '1_2_3'])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        Notification.decode_cursor(cursor)
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from routes.bookings_bp.models import Notification
+
+
+def notification(user_id, _id, created_at):
+    return {
+        "_id": _id, "user_id": user_id, "message": "m", "venue_id": None, "vendor_id": None,
+        "booking_id": ObjectId(), "is_read": False, "created_at": created_at
+    }
+
+
+def test_replay_includes_notifications_from_other_workers_in_the_same_second(db):
+    user_id = ObjectId()
+    now = datetime.utcnow().replace(microsecond=0)
+    # Another worker's id sorts lower than the one the client last saw, though it was stored later
+    second = str(ObjectId.from_datetime(now))[:8]
+    seen = ObjectId(second + 'aaaaaaaaaa' + 'ffffff')
+    other_worker = ObjectId(second + 'bbbbbbbbbb' + '000001')
+    db['Notifications'].insert_many([
+        notification(user_id, seen, now + timedelta(milliseconds=100)),
+        notification(user_id, other_worker, now + timedelta(milliseconds=300)),
+    ])
+
+    replayed = Notification.find_since(user_id, str(seen), 10)
+
+    assert [item['_id'] for item in replayed] == [str(other_worker)]
+
+
+def test_replay_pages_continue_without_repeats(db):
+    user_id = ObjectId()
+    start = datetime.utcnow().replace(microsecond=0)
+    docs = [notification(user_id, ObjectId(), start + timedelta(seconds=i)) for i in range(7)]
+    db['Notifications'].insert_many(docs)
+
+    first = Notification.find_since(user_id, str(docs[0]['_id']), 3, overlap=timedelta(0))
+    rest = Notification.find_since(user_id, limit=10, after=Notification.encode_cursor(first[-1]))
+
+    assert [item['_id'] for item in first + rest] == [str(doc['_id']) for doc in docs[1:]]
@@ -0,0 +1,62 @@
+import pytest
+from bson import ObjectId
+from routes.bookings_bp.models import Notification
+from services.notification_service import NotificationDispatcher
+
+
+def make_dispatcher(monkeypatch, insert_results, flush_interval=1):
+    emitted, inserted = [], []
+
+    def insert_many(documents):
+        result = insert_results.pop(0)
+        if not isinstance(result, Exception):
+            inserted.extend(documents)
+        return result
+
+    monkeypatch.setattr(Notification, 'insert_many', staticmethod(insert_many))
+    monkeypatch.setattr('services.notification_service.socketio.emit', lambda event, data, **kwargs: emitted.append(data))
+    monkeypatch.setattr('services.notification_service.socketio.start_background_task', lambda fn, *args: None)
+    return NotificationDispatcher(flush_interval=flush_interval, max_buffer=100, max_attempts=3), emitted, inserted
+
+
+def dispatch(dispatcher, user_id):
+    notification = Notification(user_id, "Booked", ObjectId())
+    dispatcher.dispatch(user_id, 'new_booking_request', {}, notification)
+
+
+def test_events_wait_until_their_notifications_are_stored(monkeypatch):
+    dispatcher, emitted, inserted = make_dispatcher(monkeypatch, [Exception("down"), 1])
+    user_id = ObjectId()
+    dispatch(dispatcher, user_id)
+
+    dispatcher.flush()
+    assert emitted == [] and inserted == []
+
+    dispatcher.flush()
+    assert [document['_id'] for document in inserted] == [ObjectId(emitted[0]['notification_id'])]
+
+
+def test_batch_is_given_up_after_max_attempts(monkeypatch):
+    dispatcher, emitted, inserted = make_dispatcher(monkeypatch, [Exception("down")] * 3)
+    dispatch(dispatcher, ObjectId())
+
+    for _ in range(3):
+        dispatcher.flush()
+
+    assert len(emitted) == 1
+    assert inserted == [] and dispatcher.documents == []
+
+
+def test_zero_interval_writes_through(monkeypatch):
+    dispatcher, emitted, inserted = make_dispatcher(monkeypatch, [1], flush_interval=0)
+    monkeypatch.setattr(
+        'services.notification_service.socketio.start_background_task',
+        lambda fn, *args: pytest.fail("no background task in write-through mode")
+    )
+    dispatch(dispatcher, ObjectId())
+
+    assert [document['_id'] for document in inserted] == [ObjectId(emitted[0]['notification_id'])]
+
+    ran = []
+    dispatcher.defer(ran.append, 'notified')
+    assert ran == ['notified']
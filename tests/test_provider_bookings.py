@@ -0,0 +1,56 @@
+from datetime import datetime
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+
+
+def seed_bookings(db, provider_id, count):
+    customers = [ObjectId() for _ in range(3)]
+    db['User'].insert_many([
+        {"_id": customer_id, "full_name": f"Customer {i}", "email": f"c{i}@example.com", "user_type": "CUSTOMER"}
+        for i, customer_id in enumerate(customers)
+    ])
+    db['Bookings'].insert_many([
+        {
+            "customer_id": customers[i % len(customers)],
+            "venue_id": ObjectId(),
+            "venue_provider_id": provider_id,
+            "booking_date_range": [f"2026-02-{i % 28 + 1:02d}"],
+            "status": "pending",
+            "paymentStatus": "UnPaid",
+            "requested_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+            "entity_snapshot": {"name": f"Venue {i}"},
+            "owner_snapshot": {"full_name": "Provider", "email": "provider@example.com"}
+        }
+        for i in range(count)
+    ])
+
+
+def provider_bookings_commands(app, client, db, command_recorder, count):
+    """Seed `count` bookings for a fresh provider, fetch them and return (response, commands sent)."""
+    provider_id = ObjectId()
+    seed_bookings(db, provider_id, count)
+    with app.app_context():
+        token = create_access_token(identity={
+            "email": "provider@example.com", "user_type": "VENUE_PROVIDER", "user_id": str(provider_id)
+        })
+
+    command_recorder.commands = []
+    command_recorder.recording = True
+    try:
+        response = client.get('/booking/entities/venue/provider/bookings', headers={"Authorization": f"Bearer {token}"})
+    finally:
+        command_recorder.recording = False
+    return response, [command_name for command_name, _ in command_recorder.commands]
+
+
+def test_provider_bookings_use_a_constant_number_of_commands(app, client, db, command_recorder):
+    one_response, one_commands = provider_bookings_commands(app, client, db, command_recorder, 1)
+    many_response, many_commands = provider_bookings_commands(app, client, db, command_recorder, 50)
+
+    assert one_response.status_code == 200
+    assert many_response.status_code == 200
+    assert len(one_response.json['bookings']) == 1
+    assert len(many_response.json['bookings']) == 50
+    assert all(booking['customer_details']['email'] for booking in many_response.json['bookings'])
+    assert one_commands == many_commands == ['aggregate']
@@ -0,0 +1,23 @@
+import pytest
+from bson import ObjectId
+from models.indexes import ensure_indexes
+from models.query_plans import plan_problems, query_cases, seed
+
+# Labels only; each test rebuilds the calls against the ids it seeded
+LABELS = [label for label, _ in query_cases(dict.fromkeys(('user', 'venue', 'vendor', 'staff', 'payment', 'booking'), [ObjectId()] * 4))]
+
+
+@pytest.mark.parametrize('label', LABELS)
+def test_query_uses_an_index(db, command_recorder, label):
+    ensure_indexes(db)
+    call = dict(query_cases(seed(db, 200)))[label]
+
+    command_recorder.commands = []
+    command_recorder.recording = True
+    try:
+        call()
+    finally:
+        command_recorder.recording = False
+
+    assert command_recorder.commands
+    assert plan_problems(db, command_recorder.commands) == []
@@ -0,0 +1,30 @@
+from services.rate_limit_service import MemoryBucketStore
+
+
+def test_refilled_buckets_are_swept(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.rate_limit_service.time.monotonic', lambda: now[0])
+    store = MemoryBucketStore(sweep_interval=60)
+
+    for i in range(100):
+        store.take(f"account:user{i}@example.com", 5, 5 / 60)
+    assert len(store.buckets) == 100
+
+    # A minute later every bucket is full again, so the next take sweeps them out
+    now[0] += 61
+    store.take("account:new@example.com", 5, 5 / 60)
+    assert list(store.buckets) == ["account:new@example.com"]
+
+
+def test_buckets_are_capped_by_least_recent_use(monkeypatch):
+    monkeypatch.setattr('services.rate_limit_service.time.monotonic', lambda: 1000.0)
+    store = MemoryBucketStore(max_buckets=2)
+
+    store.take("a", 1, 1 / 60)
+    store.take("b", 1, 1 / 60)
+    assert store.take("a", 1, 1 / 60)[0] is False
+    store.take("c", 1, 1 / 60)
+
+    assert list(store.buckets) == ["a", "c"]
+    # The limited bucket survived and is still empty
+    assert store.take("a", 1, 1 / 60)[0] is False
@@ -0,0 +1,57 @@
+import pytest
+from bson import ObjectId
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from socketio_instance import init_socketio, socketio, user_room
+
+
+@pytest.fixture
+def socket_app():
+    app = Flask(__name__)
+    app.config.update(TESTING=True, JWT_SECRET_KEY='test')
+    JWTManager(app)
+    init_socketio(app)
+    return app
+
+
+def connect(app, user_id):
+    with app.app_context():
+        token = create_access_token(identity={"email": f"{user_id}@example.com", "user_type": "CUSTOMER", "user_id": str(user_id)})
+    client = socketio.test_client(app, namespace='/notifications', auth={"token": token})
+    assert client.is_connected('/notifications')
+    return client
+
+
+def packets_sent(monkeypatch):
+    """Count the packets the server writes to individual sockets."""
+    sent = []
+    for name in ('_send_packet', '_send_eio_packet'):
+        def counting(eio_sid, packet, send=getattr(socketio.server, name)):
+            sent.append(eio_sid)
+            return send(eio_sid, packet)
+        monkeypatch.setattr(socketio.server, name, counting)
+    return sent
+
+
+def test_socket_without_a_valid_token_is_refused(socket_app):
+    client = socketio.test_client(socket_app, namespace='/notifications', auth={"token": "not-a-token"})
+    assert not client.is_connected('/notifications')
+
+
+@pytest.mark.parametrize('bystanders', [5, 50])
+def test_emit_reaches_only_the_users_room(socket_app, monkeypatch, bystanders):
+    target = ObjectId()
+    target_clients = [connect(socket_app, target) for _ in range(2)]
+    other_clients = [connect(socket_app, ObjectId()) for _ in range(bystanders)]
+    for client in target_clients + other_clients:
+        client.get_received('/notifications')
+
+    sent = packets_sent(monkeypatch)
+    socketio.emit('new_booking_request', {'message': 'Booked'}, room=user_room(target), namespace='/notifications')
+
+    # One packet per socket of the target user, however many others are connected
+    assert len(sent) == len(target_clients)
+    for client in target_clients:
+        assert [event['name'] for event in client.get_received('/notifications')] == ['new_booking_request']
+    for client in other_clients:
+        assert client.get_received('/notifications') == []
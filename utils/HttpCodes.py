@@ -5,4 +5,7 @@ HTTP_500_INTERNAL_SERVER_ERROR = 500
 HTTP_401_UNAUTHORIZED = 401
 HTTP_403_NOT_VERIFIED = 403
 HTTP_404_NOT_FOUND = 404
-HTTP_405_METHOD_NOT_ALLOWED = 405
\ No newline at end of file
+HTTP_405_METHOD_NOT_ALLOWED = 405
+HTTP_409_CONFLICT = 409
+HTTP_429_TOO_MANY_REQUESTS = 429
+HTTP_503_SERVICE_UNAVAILABLE = 503
\ No newline at end of file